@@ -0,0 +1,112 @@
+"""
+Compare pickled sklearn/XGBoost models with their compact exports.
+
+For every crop that has been through export_compact_models.py, reports the
+max prediction difference, single-row and batch latency, and memory: heap
+allocated by loading the pickle (tracemalloc) vs the compact node arrays
+(memory-mapped, so they are paged in on demand rather than allocated).
+
+Run from the repo root (after training + export):
+    python -m benchmarks.bench_compact_models [--crops Rice Wheat] [--batch 1000]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.utils.compact_forest import CompactForest
+from src.utils.model_bundle import BundleFile, bundle_path
+
+MODELS_DIR = "models"
+KINDS = ["random_forest", "xgboost"]
+
+
+def _per_call_ms(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _load_measured(loader):
+    tracemalloc.start()
+    obj = loader()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, peak
+
+
+def model_loaders(safe, kind):
+    """(load pickled model, load compact model, (pickle bytes, compact bytes)) or None if not exported."""
+    path = bundle_path(MODELS_DIR, safe)
+    if os.path.exists(path):
+        sections = BundleFile(path).sections
+        if f"{kind}_compact" not in sections:
+            return None
+        return (lambda: BundleFile(path).load(kind), lambda: BundleFile(path).compact(kind),
+                (sections[kind]["length"], sections[f"{kind}_compact"]["length"]))
+
+    pkl_path = os.path.join(MODELS_DIR, safe, f"{safe}_{kind}.pkl")
+    prefix = os.path.join(MODELS_DIR, safe, f"{safe}_{kind}.compact")
+    if not (os.path.exists(pkl_path) and os.path.exists(prefix + ".json")):
+        return None
+    return (lambda: joblib.load(pkl_path), lambda: CompactForest.load(prefix),
+            (os.path.getsize(pkl_path), os.path.getsize(prefix + ".npy")))
+
+
+def bench_model(load_model, load_compact, disk_bytes, batch, rng):
+    load_model()  # first load pays one-off module imports; don't count them
+    model, pickle_heap = _load_measured(load_model)
+    compact, compact_heap = _load_measured(load_compact)
+
+    # Random inputs spanning each feature's split-threshold range
+    thresholds = np.asarray(compact.nodes["threshold"])
+    features = np.asarray(compact.nodes["feature"])
+    lo = np.array([thresholds[features == f].min(initial=0) for f in range(compact.n_features)])
+    hi = np.array([thresholds[features == f].max(initial=1) for f in range(compact.n_features)])
+    X = (lo + (hi - lo) * rng.random((batch, compact.n_features))).astype(np.float32)
+    # Models fitted on a DataFrame get named columns, the CSR-fitted random forest the array
+    X_df = pd.DataFrame(X, columns=compact.feature_names) if hasattr(model, "feature_names_in_") else X
+
+    return {
+        "max_abs_diff": float(np.abs(model.predict(X_df) - compact.predict(X)).max()),
+        "single_ms": (_per_call_ms(lambda: model.predict(X_df[:1]), 20),
+                      _per_call_ms(lambda: compact.predict(X[:1]), 200)),
+        "batch_ms": (_per_call_ms(lambda: model.predict(X_df), 3),
+                     _per_call_ms(lambda: compact.predict(X), 3)),
+        "heap_mb": (pickle_heap / 1e6, compact_heap / 1e6),
+        "disk_mb": (disk_bytes[0] / 1e6, disk_bytes[1] / 1e6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crops", nargs="+")
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    crop_dirs = sorted(os.listdir(MODELS_DIR)) if os.path.isdir(MODELS_DIR) else []
+    if args.crops:
+        crop_dirs = [c.replace("/", "_") for c in args.crops]
+
+    print(f"{'crop':<22}{'model':<15}{'max|Δ|':>9}{'1-row ms':>16}{f'{args.batch}-row ms':>18}"
+          f"{'heap MB':>16}{'disk MB':>14}")
+    for safe in crop_dirs:
+        for kind in KINDS:
+            loaders = model_loaders(safe, kind)
+            if loaders is None:
+                continue
+            r = bench_model(*loaders, args.batch, rng)
+            pair = lambda v, fmt: f"{v[0]:{fmt}} → {v[1]:{fmt}}"
+            print(f"{safe:<22}{kind:<15}{r['max_abs_diff']:>9.1e}{pair(r['single_ms'], '.2f'):>16}"
+                  f"{pair(r['batch_ms'], '.1f'):>18}{pair(r['heap_mb'], '.1f'):>16}{pair(r['disk_mb'], '.1f'):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark per-request feature assembly for /api/simulate.
+
+Compares the previous pandas path (DataFrame → select_dtypes →
+OneHotEncoder.transform → join → reindex) with the FeatureAssembler built at
+model-load time, for single requests and batches. Checks that both produce
+identical matrices, and reports model predict time for scale.
+
+Run from the repo root (after training):
+    python -m benchmarks.bench_feature_assembly [--crop Rice] [--batch 1000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.app.services.model_registry import ModelRegistry
+
+
+def legacy_build_features(X, encoder, feature_names):
+    """Pre-assembler implementation from src/app/routes/analysis.py."""
+    cat_cols = X.select_dtypes(include=["object", "str"]).columns
+    num_cols = X.select_dtypes(exclude=["object", "str"]).columns
+
+    if len(cat_cols) > 0:
+        X_cat = encoder.transform(X[cat_cols])
+        X = pd.DataFrame(
+            X_cat,
+            columns=encoder.get_feature_names_out(cat_cols),
+            index=X.index
+        ).join(X[num_cols])
+
+    return X.reindex(columns=feature_names, fill_value=0)
+
+
+def _per_call_us(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def sample_rows(states, n, rng):
+    """Rows shaped like analysis.feature_row() output."""
+    rows = []
+    for _ in range(n):
+        rainfall = float(rng.uniform(300, 3000))
+        rows.append({
+            "State": states[rng.integers(len(states))],
+            "Year": int(rng.integers(1997, 2020)),
+            "Rainfall_x": rainfall,
+            "Rainfall_y": rainfall,
+            "Fertilizer_Total": float(rng.uniform(1e4, 1e6)),
+            "Pesticides": float(rng.uniform(1e3, 1e5)),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crop", default="Rice")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    bundle = ModelRegistry().get(args.crop)
+    encoder, feature_names, assembler = bundle.encoder, bundle.feature_names, bundle.assembler
+    states = list(encoder.categories_[0]) + ["Atlantis"]  # plus one unknown state
+    rng = np.random.default_rng(0)
+
+    single, batch = sample_rows(states, 1, rng), sample_rows(states, args.batch, rng)
+    for rows in (single, batch, sample_rows(["Atlantis"], 5, rng)):
+        expected = legacy_build_features(pd.DataFrame(rows), encoder, feature_names).to_numpy(dtype=float)
+        assert np.array_equal(assembler.transform(rows), expected), "assembler output differs from pandas path"
+    print(f"✅ {args.crop}: assembler matches the pandas path ({len(feature_names)} features)")
+
+    X1 = assembler.model_input(bundle.model, assembler.transform(single))
+    results = {
+        "1 row": (_per_call_us(lambda: legacy_build_features(pd.DataFrame(single), encoder, feature_names), args.repeat // 10),
+                  _per_call_us(lambda: assembler.transform(single), args.repeat),
+                  _per_call_us(lambda: bundle.model.predict(X1), args.repeat // 10)),
+    }
+    Xb = assembler.model_input(bundle.model, assembler.transform(batch))
+    results[f"{args.batch} rows"] = (
+        _per_call_us(lambda: legacy_build_features(pd.DataFrame(batch), encoder, feature_names), 20),
+        _per_call_us(lambda: assembler.transform(batch), 20),
+        _per_call_us(lambda: bundle.model.predict(Xb), 5),
+    )
+
+    print(f"\nmodel: {type(bundle.model).__name__}")
+    print(f"{'input':<12}{'pandas µs':>12}{'assembler µs':>15}{'speedup':>10}{'predict µs':>13}")
+    for name, (legacy, fast, predict) in results.items():
+        print(f"{name:<12}{legacy:>12.1f}{fast:>15.1f}{legacy / fast:>9.0f}×{predict:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Import-time regression check for the API (cold start).
+
+Imports `src.app.main` in fresh interpreters with `python -X importtime`,
+reports the median cumulative import time and the slowest top-level
+imports, and fails (exit code 1) when:
+  - the median exceeds the budget, or
+  - a heavy module (pandas, sklearn, joblib, pyarrow, xgboost) is imported
+    eagerly; these must load lazily on first use / in the lifespan warm-up.
+
+Run from the repo root:
+    python -m benchmarks.bench_import_time [--runs 5] [--budget-ms 750]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULE = "src.app.main"
+HEAVY_MODULES = ["pandas", "sklearn", "joblib", "pyarrow", "xgboost"]
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "750"))
+
+
+def import_profile(module=MODULE):
+    """{module: cumulative µs} for one cold import in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return cumulative
+
+
+def eager_heavy_modules(module=MODULE):
+    code = (f"import json, sys, {module}; "
+            f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    import_profile()  # first run warms the OS file cache
+    profiles = [import_profile() for _ in range(args.runs)]
+    total_ms = statistics.median(p[MODULE] for p in profiles) / 1000
+
+    last = profiles[-1]
+    print(f"{'module':<45}{'cumulative ms':>15}")
+    for name, us in sorted(last.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"{name:<45}{us / 1000:>15.1f}")
+
+    failures = []
+    heavy = eager_heavy_modules()
+    if heavy:
+        failures.append(f"heavy modules imported eagerly: {', '.join(heavy)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    print(f"\n{MODULE}: median {total_ms:.0f} ms over {args.runs} run(s) (budget {args.budget_ms:.0f} ms)")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ within budget, no heavy modules imported eagerly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Check and time the grouped imputation engine (src/data_preprocessing/imputation.py).
+
+1. Golden check: rerun handle_missing → merge_datasets → create_master_table
+   on data/processed/std_*.csv in a scratch dir and compare the result with the
+   shipped data/final/master_table.csv.
+2. Equivalence + timing against the previous per-column/per-state loops on the
+   shipped tables with injected NaNs / false zeros, scaled up by --scale.
+
+Run from the repo root:
+    python -m benchmarks.bench_imputation [--scale 1 4 16]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import storage
+from src.data_preprocessing.create_master_table import fill_missing_values
+from src.data_preprocessing.merge_datasets import fix_false_zeros
+
+KEYS = ["State", "Year", "Crop"]
+
+
+# ---------- Previous implementations (reference) ----------
+def legacy_fill_missing_values(df):
+    for col in df.columns:
+        if col in ["State", "Year", "Crop"]:
+            continue
+        for state, sub in df.groupby("State"):
+            state_vals = sub[col].dropna()
+            if len(state_vals) > 0:
+                mask = (df["State"] == state) & (df[col].isna())
+                df.loc[mask, col] = state_vals.mean()
+        if df[col].isna().sum() > 0:
+            df[col] = df[col].fillna(df[col].mean())
+    return df
+
+
+def legacy_fix_false_zeros(df):
+    for col in [c for c in df.columns if "_Yield" in c]:
+        for state, sub in df.groupby("State"):
+            state_vals = sub[col].replace(0, np.nan)
+            if state_vals.notna().sum() > 0:
+                mask = (df["State"] == state) & (df[col] == 0)
+                df.loc[mask, col] = state_vals.mean()
+        national_mean = df.loc[df[col] != 0, col].mean()
+        df[col] = df[col].replace(0, national_mean)
+    return df
+
+
+# ---------- Golden check ----------
+def golden_check():
+    root = os.getcwd()
+    work = tempfile.mkdtemp(prefix="bench_imputation_")
+    for sub in ("processed", "cleaned", "final"):
+        os.makedirs(os.path.join(work, "data", sub))
+    for path in glob.glob(os.path.join(root, "data", "processed", "std_*.csv")):
+        shutil.copy(path, os.path.join(work, "data", "processed"))
+
+    from benchmarks.bench_storage import run_pipeline
+
+    old_format = storage.STORAGE_FORMAT
+    storage.STORAGE_FORMAT = "csv"
+    try:
+        os.chdir(work)
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_pipeline()
+        produced = pd.read_csv("data/final/master_table.csv")
+    finally:
+        storage.STORAGE_FORMAT = old_format
+        os.chdir(root)
+        shutil.rmtree(work, ignore_errors=True)
+
+    golden = pd.read_csv(os.path.join(root, "data", "final", "master_table.csv"))
+    pd.testing.assert_frame_equal(
+        produced.sort_values(KEYS).reset_index(drop=True),
+        golden.sort_values(KEYS).reset_index(drop=True),
+        check_exact=False, rtol=1e-9,
+    )
+
+
+# ---------- Equivalence + scaling ----------
+def _scaled(df, scale):
+    """Repeat the table `scale` times under distinct state names."""
+    parts = []
+    for i in range(scale):
+        part = df.copy()
+        part["State"] = part["State"] + ("" if i == 0 else f" #{i}")
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _perturb(df, cols, value, frac, seed):
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    for col in cols:
+        df.loc[rng.random(len(df)) < frac, col] = value
+    return df
+
+
+def _compare(name, legacy_fn, new_fn, df):
+    start = time.perf_counter()
+    expected = legacy_fn(df.copy())
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = new_fn(df.copy())
+    new_s = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+    print(f"{name:<22}{len(df):>10}{legacy_s:>12.3f}{new_s:>12.4f}{legacy_s / new_s:>10.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    golden_check()
+    print("✅ Pipeline output matches data/final/master_table.csv")
+
+    master = pd.read_csv("data/final/master_table.csv")
+    master_cols = [c for c in master.columns if c not in KEYS]
+    # fix_false_zeros matches "_Yield" case-sensitively; the shipped district
+    # columns are upper-case (and so untouched by the pipeline), rename to exercise it
+    district = pd.read_csv("data/cleaned/district_crop_clean.csv")
+    district.columns = [c.replace("_YIELD", "_Yield") for c in district.columns]
+    yield_cols = [c for c in district.columns if "_Yield" in c]
+
+    print(f"\n{'function':<22}{'rows':>10}{'legacy (s)':>12}{'new (s)':>12}{'speedup':>11}")
+    for scale in args.scale:
+        missing = _perturb(_scaled(master, scale), master_cols, np.nan, 0.1, seed=scale)
+        _compare("fill_missing_values", legacy_fill_missing_values, fill_missing_values, missing)
+
+        zeros = _perturb(_scaled(district, scale), yield_cols, 0.0, 0.1, seed=scale)
+        _compare("fix_false_zeros", legacy_fix_false_zeros, fix_false_zeros, zeros)
+
+
+if __name__ == "__main__":
+    main()
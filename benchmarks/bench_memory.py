@@ -0,0 +1,114 @@
+"""
+In-memory footprint of the pipeline tables and training matrices, before vs
+after the shared dtype schema (src/data_preprocessing/schema.py).
+
+    tables    every table declared in the schema that exists under data/:
+              pd.read_csv defaults (object strings, int64/float64) vs
+              read_table as the trainers call it (categorical keys, int16
+              Year, float32 measures)
+    training  the design matrices the trainers fit on, from the master table:
+              train_models.py (dense get_dummies vs the CSR float32 matrix)
+              and train_per_crop.py summed over crops (dense float64 one-hot
+              + numerics vs the CSR float32 matrix); CSR size is its data,
+              indices and indptr arrays
+
+Writes the numbers to reports/memory_report.json.
+
+Run from the repo root:
+    python -m benchmarks.bench_memory [--out reports/memory_report.json]
+"""
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import OneHotEncoder
+
+from src import train_per_crop
+from src.data_preprocessing.schema import DATASETS, dataset_name
+from src.data_preprocessing.storage import read_table
+
+MB = 1024 * 1024
+
+
+def _mb(df):
+    return df.memory_usage(deep=True).sum() / MB
+
+
+def _csr_mb(X):
+    return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / MB
+
+
+def table_footprints():
+    rows = []
+    for path in sorted(glob.glob("data/**/*.csv", recursive=True)):
+        if ".parts" in path or dataset_name(path) not in DATASETS:
+            continue
+        before = pd.read_csv(path)
+        after = read_table(path, fmt="csv", float32_measures=True)
+        rows.append({"table": path, "rows": len(before), "before_mb": _mb(before), "after_mb": _mb(after)})
+    return rows
+
+
+def training_footprints(master_path):
+    before_df = pd.read_csv(master_path)
+    after_df = read_table(master_path, float32_measures=True)
+    rows = []
+
+    # train_models.py: one-hot over the whole master table
+    dense = pd.get_dummies(before_df, drop_first=True).drop(columns=["Yield"])
+    sparse, _ = train_per_crop.sparse_matrix(
+        pd.get_dummies(after_df, drop_first=True, sparse=True, dtype=np.float32).drop(columns=["Yield"]))
+    rows.append({"table": "train_models X", "rows": len(dense), "before_mb": _mb(dense), "after_mb": _csr_mb(sparse)})
+
+    # train_per_crop.py: State one-hot + numeric features, per crop
+    before_mb = after_mb = 0.0
+    for crop, before_crop in before_df.groupby("Crop", sort=False):
+        after_crop = after_df[after_df["Crop"] == crop]
+        X_before = before_crop.drop(columns=["Yield", "Crop"])
+        X_after = after_crop.drop(columns=["Yield", "Crop"])
+        num_cols = [c for c in X_before.columns if c != "State"]
+
+        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
+        onehot = encoder.fit_transform(X_before[["State"]])
+        before_mb += _mb(pd.DataFrame(onehot, index=X_before.index).join(X_before[num_cols]))
+
+        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+        onehot = encoder.fit_transform(X_after[["State"]])
+        numeric = sp.csr_matrix(X_after[num_cols].to_numpy(dtype=np.float32))
+        after_mb += _csr_mb(sp.hstack([onehot, numeric], format="csr"))
+    rows.append({"table": "train_per_crop X (all crops)", "rows": len(before_df),
+                 "before_mb": before_mb, "after_mb": after_mb})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.path.join("reports", "memory_report.json"))
+    args = parser.parse_args()
+
+    results = {
+        "tables": table_footprints(),
+        "training": training_footprints(train_per_crop.DATA_FILE),
+    }
+
+    print(f"{'table':<44}{'rows':>9}{'before (MB)':>13}{'after (MB)':>12}{'ratio':>8}")
+    for section in ("tables", "training"):
+        for r in results[section]:
+            print(f"{r['table']:<44}{r['rows']:>9}{r['before_mb']:>13.2f}{r['after_mb']:>12.2f}"
+                  f"{r['before_mb'] / r['after_mb']:>7.1f}×")
+    before = sum(r["before_mb"] for r in results["tables"])
+    after = sum(r["after_mb"] for r in results["tables"])
+    print(f"{'all tables':<44}{'':>9}{before:>13.2f}{after:>12.2f}{before / after:>7.1f}×")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Report written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+In-memory vs out-of-core merge_datasets → create_master_table.
+
+Generates synthetic raw data at --scale (src/data_preprocessing/synthetic_data.py)
+in a scratch dir, runs the pipeline up to the cleaned tables, then runs the
+merge and master-table stages in each mode in a fresh interpreter and
+reports wall time, peak RSS and whether the master tables match.
+
+Run from the repo root:
+    python -m benchmarks.bench_out_of_core [--scale 4] [--chunk-rows 20000]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+from src.data_preprocessing import synthetic_data
+
+CLEAN_STAGES = ["clean_crop_yield", "clean_district_crop", "clean_fertilizer", "clean_pesticides", "clean_rainfall"]
+
+RUN_MODE = """
+import contextlib, io, json, resource, time
+from src.data_preprocessing.merge_datasets import merge_datasets
+from src.data_preprocessing.create_master_table import create_master_table
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    merge_datasets(out_of_core={out_of_core})
+    create_master_table(out_of_core={out_of_core})
+print(json.dumps({{"seconds": time.perf_counter() - start,
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def _run(cmd, cwd, env):
+    proc = subprocess.run(cmd, cwd=cwd, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    return proc.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=4)
+    parser.add_argument("--chunk-rows", type=int, default=None)
+    args = parser.parse_args()
+
+    repo = os.getcwd()
+    env = dict(os.environ, PYTHONPATH=repo)
+    if args.chunk_rows:
+        env["PIPELINE_CHUNK_ROWS"] = str(args.chunk_rows)
+
+    work = tempfile.mkdtemp(prefix="bench_out_of_core_")
+    try:
+        synthetic_data.generate(work, scale=args.scale)
+        _run([sys.executable, "-m", "src.data_preprocessing.pipeline", "--only", *CLEAN_STAGES], work, env)
+
+        results, tables = {}, {}
+        for name, out_of_core in [("in-memory", False), ("out-of-core", True)]:
+            results[name] = json.loads(_run([sys.executable, "-c", RUN_MODE.format(out_of_core=out_of_core)],
+                                            work, env).strip().splitlines()[-1])
+            tables[name] = pd.read_csv(os.path.join(work, "data", "final", "master_table.csv"))
+        rows = len(tables["in-memory"])
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    try:
+        pd.testing.assert_frame_equal(tables["in-memory"], tables["out-of-core"], check_exact=False)
+        same = True
+    except AssertionError:
+        same = False
+
+    print(f"scale {args.scale}× → master table {rows} rows")
+    print(f"{'mode':<14}{'time (s)':>10}{'peak RSS (MB)':>16}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['seconds']:>10.2f}{r['peak_rss_mb']:>16.0f}")
+    print(f"same output: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark IMD subdivision → state expansion (standardize_columns.expand_subdivisions).
+
+Generates a synthetic rainfall series in the raw IMD layout (mapped and
+unmapped subdivisions, splits like "Assam & Meghalaya"), checks the join-based
+expansion against the previous iterrows() loop on a sample, and times the
+join on the full input.
+
+Run from the repo root:
+    python -m benchmarks.bench_rainfall [--rows 10000000] [--sample 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing.standardize_columns import (
+    clean_state_name,
+    expand_subdivisions,
+    load_subdivision_map,
+)
+
+# Subdivisions absent from the mapping file keep their own name
+UNMAPPED = ["Kerala", "Bihar", "Punjab", "Tamil Nadu", "Jharkhand", "Chhattisgarh", "Telangana"]
+
+
+def synthetic_rainfall(n_rows, mapping, seed=42):
+    rng = np.random.default_rng(seed)
+    subdivisions = np.array(sorted(mapping["Subdivision"].unique()) + UNMAPPED, dtype=object)
+    return pd.DataFrame({
+        "Subdivision": pd.Categorical(subdivisions[rng.integers(0, len(subdivisions), n_rows)]),
+        "Year": rng.integers(1901, 2018, n_rows),
+        "Rainfall": rng.gamma(4.0, 300.0, n_rows).round(1),
+    })
+
+
+def legacy_expand(df, mapping):
+    """Previous row-by-row implementation, kept for comparison."""
+    subdivision_map = mapping.groupby("Subdivision")["State"].agg(list).to_dict()
+    expanded_rows = []
+    for _, row in df.iterrows():
+        for state in subdivision_map.get(row["Subdivision"], [row["Subdivision"]]):
+            expanded_rows.append({"State": state, "Year": row["Year"], "Rainfall": row["Rainfall"]})
+    new_df = pd.DataFrame(expanded_rows)
+    new_df["State"] = new_df["State"].apply(clean_state_name)
+    return new_df.groupby(["State", "Year"], as_index=False).agg({"Rainfall": "mean"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--sample", type=int, default=20_000)
+    args = parser.parse_args()
+
+    mapping = load_subdivision_map()
+
+    sample = synthetic_rainfall(args.sample, mapping)
+    sample["Subdivision"] = sample["Subdivision"].astype(object)
+    start = time.perf_counter()
+    expected = legacy_expand(sample, mapping)
+    legacy_s = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = expand_subdivisions(sample, mapping)
+    new_s = time.perf_counter() - start
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    print(f"✅ {args.sample:,} rows: identical output | iterrows {legacy_s:.2f}s, join {new_s:.3f}s")
+
+    df = synthetic_rainfall(args.rows, mapping)
+    start = time.perf_counter()
+    out = expand_subdivisions(df, mapping)
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ {args.rows:,} rows → {len(out):,} state-years in {elapsed:.2f}s "
+          f"({args.rows / elapsed / 1e6:.1f}M rows/s; iterrows extrapolated ≈ {legacy_s * args.rows / args.sample:.0f}s)")
+
+
+if __name__ == "__main__":
+    main()
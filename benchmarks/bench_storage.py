@@ -0,0 +1,109 @@
+"""
+Compare CSV vs Feather vs Parquet table storage.
+
+Times the preprocessing chain (handle_missing → merge_datasets →
+create_master_table) and the API cold start (first master-table load in
+data_loader) for each format, on a scratch copy of data/processed/.
+
+Run from the repo root:
+    python -m benchmarks.bench_storage [--repeat 3]
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from src.data_preprocessing import storage
+
+FORMATS = ["csv", "feather", "parquet"]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def _prepare_workspace(src_root, fmt):
+    """Scratch tree with the standardized inputs stored in `fmt`."""
+    work = tempfile.mkdtemp(prefix=f"bench_storage_{fmt}_")
+    for sub in ("processed", "cleaned", "final"):
+        os.makedirs(os.path.join(work, "data", sub))
+    for path in glob.glob(os.path.join(src_root, "data", "processed", "std_*.csv")):
+        dest = os.path.join(work, "data", "processed", os.path.basename(path))
+        storage.write_table(pd.read_csv(path), dest, fmt=fmt, write_csv=(fmt == "csv"))
+    return work
+
+
+def run_pipeline():
+    from src.data_preprocessing import handle_missing, merge_datasets, create_master_table
+
+    handle_missing.clean_crop_yield()
+    handle_missing.clean_district_crop()
+    handle_missing.clean_fertilizer()
+    handle_missing.clean_pesticides()
+    handle_missing.clean_rainfall()
+    merge_datasets.merge_datasets()
+    create_master_table.create_master_table()
+
+
+def api_cold_start():
+    from src.app.services import data_loader
+
+    data_loader.clear_cache()
+    data_loader.get_states()
+
+
+def bench_format(src_root, fmt, repeat):
+    work = _prepare_workspace(src_root, fmt)
+    old_cwd = os.getcwd()
+    storage.STORAGE_FORMAT, storage.WRITE_CSV = fmt, fmt == "csv"
+    try:
+        os.chdir(work)
+        pipeline = min(_timed(run_pipeline) for _ in range(repeat))
+        cold = min(_timed(api_cold_start) for _ in range(repeat))
+        master = storage.read_table("data/final/master_table.csv", fmt=fmt)
+        size = os.path.getsize(storage.resolve_path("data/final/master_table.csv", fmt=fmt))
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(work, ignore_errors=True)
+    return {"pipeline_s": pipeline, "api_cold_start_s": cold, "master_bytes": size}, master
+
+
+def _same_table(a, b):
+    keys = ["State", "Year", "Crop"]
+    a = a.astype({k: str for k in ("State", "Crop")}).sort_values(keys).reset_index(drop=True)
+    b = b.astype({k: str for k in ("State", "Crop")}).sort_values(keys).reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(a, b, check_dtype=False, check_exact=False)
+        return True
+    except AssertionError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    src_root = os.getcwd()
+    results, tables = {}, {}
+    for fmt in FORMATS:
+        results[fmt], tables[fmt] = bench_format(src_root, fmt, args.repeat)
+
+    print(f"{'format':<10}{'pipeline (s)':>14}{'cold start (ms)':>17}{'master size (KB)':>18}  same output")
+    for fmt, r in results.items():
+        same = _same_table(tables["csv"], tables[fmt])
+        print(f"{fmt:<10}{r['pipeline_s']:>14.3f}{r['api_cold_start_s'] * 1000:>17.1f}"
+              f"{r['master_bytes'] / 1024:>18.0f}  {same}")
+
+
+if __name__ == "__main__":
+    main()
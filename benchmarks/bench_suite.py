@@ -0,0 +1,351 @@
+"""
+Benchmark suite: API latency/throughput and per-crop training time on the
+shipped master table and scaled-up copies of it (benchmarks/scaled_data.py).
+
+Every scenario runs in a fresh interpreter (so peak RSS is per scenario),
+in a scratch workspace whose data/final/master_table.csv is scaled by each
+of --scales:
+  api    trains --crop on the scaled table into a scratch models/ dir (in
+         its own interpreter, not measured), then drives the FastAPI app
+         in-process (TestClient, lifespan warm-up included) and records
+         p50/p99 latency, throughput under --concurrency and error count per
+         route, plus the time until /health/ready
+  train  retrains the --train-top largest crops with train_per_crop into a
+         scratch models/ dir and records per-crop and wall time
+
+Results are written to reports/benchmarks/<label>.json (label defaults to
+the short git commit): one flat, key-sorted entry per scenario/route, so two
+runs diff line by line, or compare them directly:
+
+Run from the repo root:
+    python -m benchmarks.bench_suite [--scales 1 10 100] [--requests 200] [--label NAME]
+    python -m benchmarks.bench_suite --compare reports/benchmarks/OLD.json reports/benchmarks/NEW.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RESULTS_DIR = os.path.join("reports", "benchmarks")
+MASTER_TABLE = os.path.join("data", "final", "master_table.csv")
+READY_TIMEOUT = 300
+
+# Metrics where a higher value is a regression (everything else: lower is worse)
+LOWER_IS_BETTER = ("_ms", "_seconds", "_mb")
+CONTEXT_FIELDS = {"rows", "threads"}  # reported, never compared
+
+
+def peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KB on Linux
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+# ---------------------------------------------------------------------------
+# api scenario
+# ---------------------------------------------------------------------------
+
+def api_routes(state, crop):
+    """Route label → fn(i) returning (method, url, httpx kwargs) for the i-th request."""
+    body = {"state": state, "crop": crop, "year": 2010, "rainfall": 900.0, "fertilizer": 100000.0,
+            "pesticides": 20000.0}
+    grid = dict(body, rainfall_change={"start": -50, "stop": 50, "step": 5},
+                fertilizer_change={"start": -50, "stop": 50, "step": 5})
+    return {
+        "GET /api/states": lambda i: ("GET", "/api/states", {}),
+        "GET /api/crops": lambda i: ("GET", "/api/crops", {"params": {"state": state}}),
+        # Distinct inputs per request: measures the model path, not the result cache
+        "POST /api/simulate": lambda i: ("POST", "/api/simulate", {"json": dict(body, pesticides=20000.0 + i)}),
+        "POST /api/simulate [cached]": lambda i: ("POST", "/api/simulate", {"json": body}),
+        "POST /api/simulate/batch [32]": lambda i: (
+            "POST", "/api/simulate/batch",
+            {"json": {"requests": [dict(body, pesticides=20000.0 + i * 32 + j) for j in range(32)]}}),
+        "POST /api/simulate/grid [21x21]": lambda i: ("POST", "/api/simulate/grid", {"json": grid}),
+        "GET /api/analysis/trends": lambda i: ("GET", "/api/analysis/trends", {"params": {"crop": crop}}),
+        "GET /api/analysis/aggregates": lambda i: ("GET", "/api/analysis/aggregates", {"params": {"crop": crop}}),
+        "GET /api/records [100]": lambda i: ("GET", "/api/records", {"params": {"crop": crop, "limit": 100}}),
+        "GET /api/records [ndjson]": lambda i: ("GET", "/api/records",
+                                                {"params": {"crop": crop, "format": "ndjson"}}),
+        "GET /metrics": lambda i: ("GET", "/metrics", {}),
+    }
+
+
+def _timed_request(client, make, i):
+    method, url, kwargs = make(i)
+    start = time.perf_counter()
+    response = client.request(method, url, **kwargs)
+    return time.perf_counter() - start, response.status_code
+
+
+def bench_route(client, make, n_requests, concurrency):
+    for i in range(min(5, n_requests)):  # warm caches, lazy imports, cube builds
+        _timed_request(client, make, -1 - i)
+
+    latencies, errors = [], 0
+    for i in range(n_requests):
+        seconds, status = _timed_request(client, make, i)
+        latencies.append(seconds * 1000)
+        errors += status >= 400
+    latencies.sort()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as threads:
+        statuses = [s for _, s in threads.map(lambda i: _timed_request(client, make, n_requests + i),
+                                             range(n_requests))]
+    wall = time.perf_counter() - start
+    errors += sum(s >= 400 for s in statuses)
+
+    return {
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "throughput_rps": round(n_requests / wall, 1),
+        "errors": errors,
+    }
+
+
+def run_api(args):
+    from fastapi.testclient import TestClient
+
+    from src.app.main import app
+
+    results = {}
+    start = time.perf_counter()
+    with TestClient(app) as client:
+        while client.get("/health/ready").status_code != 200:
+            if time.perf_counter() - start > READY_TIMEOUT:
+                raise RuntimeError("API did not become ready")
+            time.sleep(0.05)
+        results["startup"] = {"ready_seconds": round(time.perf_counter() - start, 3)}
+
+        # Fail fast instead of benchmarking the 404 path of every simulate route
+        method, url, kwargs = api_routes(args.state, args.crop)["POST /api/simulate"](0)
+        probe = client.request(method, url, **kwargs)
+        if probe.status_code != 200:
+            raise RuntimeError(f"{url} returned {probe.status_code} for crop {args.crop!r}: {probe.text[:500]}")
+
+        for label, make in api_routes(args.state, args.crop).items():
+            results[label] = bench_route(client, make, args.requests, args.concurrency)
+    results["process"] = {"peak_rss_mb": peak_rss_mb()}
+    return results
+
+
+# ---------------------------------------------------------------------------
+# train scenario
+# ---------------------------------------------------------------------------
+
+def run_train(args):
+    from src import train_per_crop
+    from src.data_preprocessing.storage import read_table
+
+    counts = read_table(train_per_crop.DATA_FILE, columns=["Crop"])["Crop"].astype(str).value_counts()
+    crops = counts.index[:args.train_top].tolist()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = train_per_crop.train_per_crop_models(crops=crops, workers=1, force=True)
+
+    results = {}
+    for timing in report["crops"]:
+        results[f"crop {timing['crop']}"] = {
+            "rows": timing["rows"],
+            "rf_seconds": timing["rf_seconds"],
+            "xgb_seconds": timing["xgb_seconds"],
+            "total_seconds": timing["total_seconds"],
+        }
+    results["process"] = {
+        "wall_seconds": report["wall_seconds"],
+        "threads": report["threads_per_crop"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    return results
+
+
+SCENARIOS = {"api": run_api, "train": run_train}
+
+
+# ---------------------------------------------------------------------------
+# Orchestration
+# ---------------------------------------------------------------------------
+
+def train_api_model(repo, workspace, crop):
+    """Train the crop the api scenario simulates into its workspace (models/ is not shipped)."""
+    cmd = [sys.executable, "-m", "src.train_per_crop", "--crops", crop, "--workers", "1"]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo, os.getenv("PYTHONPATH")])))
+    proc = subprocess.run(cmd, cwd=workspace, env=env, capture_output=True, text=True)
+    if proc.returncode != 0 or not os.path.isdir(os.path.join(workspace, "models", crop.replace("/", "_"))):
+        raise RuntimeError(f"Training {crop!r} for the api scenario failed:\n{proc.stderr[-2000:]}")
+
+
+def prepare_workspaces(root, repo, scale):
+    """Scratch dirs sharing one scaled master table, each with its own empty models/ (api/ then gets train_api_model)."""
+    from benchmarks.scaled_data import write_scaled
+
+    base = os.path.join(root, f"x{scale}")
+    rows = write_scaled(scale, os.path.join(base, "data", "final", "master_table.csv"),
+                        src_path=os.path.join(repo, MASTER_TABLE))
+
+    workspaces = {}
+    for scenario in SCENARIOS:
+        work = os.path.join(base, scenario)
+        os.makedirs(os.path.join(work, "models"))
+        os.symlink(os.path.join(base, "data"), os.path.join(work, "data"))
+        workspaces[scenario] = work
+    return rows, workspaces
+
+
+def run_scenario(repo, scenario, workspace, args):
+    """Run one scenario in a fresh interpreter; returns its results dict."""
+    cmd = [sys.executable, "-m", "benchmarks.bench_suite", "--scenario", scenario, "--workspace", workspace,
+           "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+           "--train-top", str(args.train_top), "--state", args.state, "--crop", args.crop]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo, os.getenv("PYTHONPATH")])))
+    proc = subprocess.run(cmd, cwd=repo, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{scenario} scenario failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit(repo):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment():
+    versions = {}
+    for name in ("pandas", "numpy", "sklearn", "xgboost", "fastapi"):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "versions": versions}
+
+
+def run_suite(args):
+    repo = os.getcwd()
+    commit = git_commit(repo)
+    label = args.label or commit
+    results = {}
+
+    root = tempfile.mkdtemp(prefix="bench_suite_")
+    try:
+        for scale in args.scales:
+            rows, workspaces = prepare_workspaces(root, repo, scale)
+            print(f"📦 {scale}× master table: {rows} rows")
+            if "api" in args.scenarios:
+                train_api_model(repo, workspaces["api"], args.crop)
+            for scenario in args.scenarios:
+                start = time.perf_counter()
+                for name, metrics in run_scenario(repo, scenario, workspaces[scenario], args).items():
+                    results[f"{scenario} x{scale} | {name}"] = metrics
+                print(f"✅ {scenario} x{scale} done in {time.perf_counter() - start:.1f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        "label": label,
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": environment(),
+        "settings": {"scales": args.scales, "scenarios": args.scenarios, "requests": args.requests,
+                     "concurrency": args.concurrency, "train_top": args.train_top,
+                     "state": args.state, "crop": args.crop},
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+    print_results(results)
+    print(f"\n🎉 Results written to {path}")
+    return path
+
+
+def print_results(results):
+    for key, metrics in results.items():
+        print(f"{key:<58}" + "  ".join(f"{name}={value}" for name, value in metrics.items()))
+
+
+def compare(old_path, new_path, threshold):
+    """Print per-metric changes; returns the number of regressions beyond `threshold` percent."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['label']} → {new['label']}  (regression threshold {threshold:g}%)\n")
+
+    regressions = 0
+    for key in sorted(set(old["results"]) | set(new["results"])):
+        before, after = old["results"].get(key), new["results"].get(key)
+        if before is None or after is None:
+            print(f"{key:<58}{'only in ' + (old['label'] if after is None else new['label']):>24}")
+            continue
+        for metric in sorted(set(before) & set(after)):
+            a, b = before[metric], after[metric]
+            if not isinstance(a, (int, float)) or not isinstance(b, (int, float)) or metric in CONTEXT_FIELDS:
+                continue
+            change = (b - a) / a * 100 if a else 0.0
+            worse = change > threshold if metric.endswith(LOWER_IS_BETTER) else change < -threshold
+            if metric == "errors":
+                worse = b > a
+            regressions += worse
+            flag = "  ❌" if worse else ""
+            print(f"{key:<58}{metric:<16}{a:>12g} → {b:<12g}{change:+8.1f}%{flag}")
+    print(f"\n{'❌' if regressions else '✅'} {regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads for the throughput pass")
+    parser.add_argument("--train-top", type=int, default=2, help="train the N largest crops")
+    parser.add_argument("--state", default="Andhra Pradesh")
+    parser.add_argument("--crop", default="Rice")
+    parser.add_argument("--label", help="results file name (default: short git commit)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two results files")
+    parser.add_argument("--threshold", type=float, default=10.0, help="%% change counted as a regression")
+    parser.add_argument("--scenario", choices=list(SCENARIOS), help=argparse.SUPPRESS)  # child process
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+    if args.scenario:
+        os.chdir(args.workspace)
+        with contextlib.redirect_stdout(sys.stderr):
+            results = SCENARIOS[args.scenario](args)
+        print(json.dumps(results))
+        return
+    run_suite(args)
+
+
+if __name__ == "__main__":
+    main()
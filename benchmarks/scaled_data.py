@@ -0,0 +1,63 @@
+"""
+Scaled-up copies of the master table for benchmarks.
+
+`scale_master(df, factor)` returns `factor` × the rows: the original table
+plus factor-1 replicas whose states are renamed "<State> #k" (so the
+(State, Crop, Year) key stays unique) and whose measures are jittered by a
+seeded ±5% so models and aggregates don't see exact duplicates. Crops and
+years are unchanged, so the shipped per-crop models still apply.
+
+Run from the repo root:
+    python -m benchmarks.scaled_data --factor 10 --out /tmp/scaled/data/final/master_table.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.data_preprocessing import storage
+
+MASTER_TABLE = "data/final/master_table.csv"
+MEASURES = ["Yield", "Rainfall_x", "Pesticides", "Fertilizer_Total", "Rainfall_y", "Pesticides_total_country"]
+JITTER = 0.05
+
+
+def scale_master(df, factor, seed=0):
+    if factor <= 1:
+        return df.copy()
+    rng = np.random.default_rng(seed)
+    measures = [c for c in MEASURES if c in df.columns]
+    states = df["State"].astype(str)
+
+    replicas = [df]
+    for k in range(1, factor):
+        replica = df.copy()
+        replica["State"] = states + f" #{k}"
+        noise = rng.uniform(1 - JITTER, 1 + JITTER, size=(len(df), len(measures)))
+        replica[measures] = df[measures].to_numpy(dtype=float) * noise
+        replicas.append(replica)
+    return pd.concat(replicas, ignore_index=True)
+
+
+def write_scaled(factor, out_path, src_path=MASTER_TABLE, seed=0):
+    """Write the scaled table (CSV plus the configured binary copy); returns its row count."""
+    df = scale_master(storage.read_table(src_path), factor, seed)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    storage.write_table(df, out_path)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    rows = write_scaled(args.factor, args.out, seed=args.seed)
+    print(f"✅ Wrote {rows} rows ({args.factor}×) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,72 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
-from src.app.routes import states, crops, analysis
+from src.app.routes import states, crops, analysis, insights, records, health, metrics as metrics_route
+from src.app.services import metrics, profiler
+from src.app.services.inference_pool import pool
+from src.app.services.warmup import crops_to_preload, warm_up
 
-app = FastAPI(title="Crop Yield Prediction API", version="1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm in the background: liveness answers at once, /health/ready flips when done.
+    # The crop list is resolved here so a bad PRELOAD_MODELS fails startup instead of the task.
+    warmup_task = asyncio.create_task(warm_up(crops_to_preload()))
+    yield
+    warmup_task.cancel()
+    pool.shutdown()
+
+
+app = FastAPI(title="Crop Yield Prediction API", version="1.0", lifespan=lifespan)
 
 # Register routes
-app.include_router(states.router, prefix="/api")
-app.include_router(crops.router, prefix="/api")
-app.include_router(analysis.router, prefix="/api")
+ROUTE_PREFIXES = {}  # id(route) → its router's prefix: scope["route"] can be the router's own, unprefixed route
+
+
+def include(router, prefix=""):
+    app.include_router(router, prefix=prefix)
+    ROUTE_PREFIXES.update((id(route), prefix) for route in router.routes)
+
+
+include(states.router, prefix="/api")
+include(crops.router, prefix="/api")
+include(analysis.router, prefix="/api")
+include(insights.router, prefix="/api")
+include(records.router, prefix="/api")
+include(health.router)
+include(metrics_route.router)
+
+
+def route_label(request: Request):
+    """Matched route's path template (bounded label cardinality); "unmatched" for 404s outside any route."""
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    return ROUTE_PREFIXES.get(id(route), "") + route.path
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """Request count/latency per route template, plus opt-in profiling of slow requests."""
+    forced = profiler.is_forced(request.headers)
+    sampler = profiler.SamplingProfiler().start() if profiler.should_profile(request.headers) else None
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        route = route_label(request)
+        metrics.REQUESTS.inc(method=request.method, route=route, status=str(status_code))
+        metrics.REQUEST_SECONDS.observe(elapsed, method=request.method, route=route)
+        # Stopping the sampler joins its thread and may write a file: keep it off the event loop
+        if sampler is not None and await asyncio.to_thread(profiler.finish, sampler, elapsed,
+                                                           request.method, route, forced):
+            metrics.SLOW_PROFILES.inc(route=route)
 
 
 @app.get("/")
@@ -1,16 +1,23 @@
+import asyncio
+import functools
+import time
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import joblib
+from typing import List, Optional
 import os
-import pandas as pd
+import numpy as np
 import json
+from src.app.services.coalescer import Coalescer
+from src.app.services.metrics import stage
+from src.app.services.inference_pool import RETRY_AFTER_SECONDS, PoolSaturated, pool
+from src.app.services.model_registry import get_default_model, registry
+from src.app.services.result_cache import ResultCache
 
 router = APIRouter(tags=["Analysis"])
 
-# Paths
-MODELS_DIR = "models"
-DATA_FILE = "data/final/master_table.csv"
-CONFIG_PATH = os.path.join(MODELS_DIR, "model_config.json")
+MAX_BATCH_SIZE = int(os.getenv("SIMULATE_MAX_BATCH_SIZE", "5000"))
+MAX_GRID_POINTS = int(os.getenv("SIMULATE_MAX_GRID_POINTS", "2000000"))
 
 # --- Request schema (flat structure for easy testing) ---
 class SimulationRequest(BaseModel):
@@ -25,82 +32,92 @@ class SimulationRequest(BaseModel):
     pesticides_change: float = 0.0
 
 
-# --- Default model loader (global fallback if per-crop model missing) ---
-def load_default_model():
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "r") as f:
-            config = json.load(f)
-        model_file = config.get("default_model", "best_model.pkl")
-    else:
-        model_file = "best_model.pkl"  # fallback
+class BatchSimulationRequest(BaseModel):
+    requests: List[SimulationRequest]
 
-    model_path = os.path.join(MODELS_DIR, model_file)
-    if os.path.exists(model_path):
-        return joblib.load(model_path)
-    return None
 
+class ChangeRange(BaseModel):
+    """Percentage changes to sweep: explicit `values`, or start..stop (inclusive) by step."""
+    start: float = 0.0
+    stop: float = 0.0
+    step: float = 1.0
+    values: Optional[List[float]] = None
 
-default_model = load_default_model()
 
+class GridSimulationRequest(BaseModel):
+    state: str
+    crop: str
+    year: int
+    rainfall: float
+    fertilizer: float
+    pesticides: float
+    rainfall_change: ChangeRange = ChangeRange()
+    fertilizer_change: ChangeRange = ChangeRange()
+    pesticides_change: ChangeRange = ChangeRange()
+    stream: bool = False  # NDJSON chunks instead of one JSON body
+    chunk_size: int = 10000
 
-@router.post("/simulate")
-def simulate(request: SimulationRequest):
-    crop = request.crop
-    safe_crop_name = crop.replace("/", "_")
-    crop_dir = os.path.join(MODELS_DIR, safe_crop_name)
 
-    # --- Try per-crop model first ---
+# --- Shared simulation helpers ---
+def resolve_model(crop):
+    """
+    Return (model, assembler) for a crop, falling back to the default model
+    (assembler None: it takes the raw feature rows).
+    """
     try:
-        model_path = os.path.join(crop_dir, f"{safe_crop_name}_random_forest.pkl")
-        encoder_path = os.path.join(crop_dir, f"{safe_crop_name}_encoder.pkl")
-        feature_names_path = os.path.join(crop_dir, f"{safe_crop_name}_features.pkl")
-
-        model = joblib.load(model_path)
-        encoder = joblib.load(encoder_path)
-        feature_names = joblib.load(feature_names_path)
+        bundle = registry.get(crop)
+        return bundle.model, bundle.assembler
     except FileNotFoundError:
+        default_model = get_default_model()
         if default_model is None:
             raise HTTPException(status_code=404, detail=f"No model found for crop: {crop} and no default model available")
-        # Fallback to default
-        model = default_model
-        encoder = None
-        feature_names = None
-
-    # Apply adjustments
-    adjusted_rainfall = request.rainfall * (1 + request.rainfall_change / 100)
-    adjusted_fertilizer = request.fertilizer * (1 + request.fertilizer_change / 100)
-    adjusted_pesticides = request.pesticides * (1 + request.pesticides_change / 100)
-
-    # Build feature row
-    input_data = {
-        "State": request.state,
-        "Year": request.year,
-        "Rainfall": adjusted_rainfall,
-        "Fertilizer": adjusted_fertilizer,
-        "Pesticides": adjusted_pesticides
+        return default_model, None
+
+
+def adjust_inputs(request: SimulationRequest):
+    return {
+        "rainfall": request.rainfall * (1 + request.rainfall_change / 100),
+        "fertilizer": request.fertilizer * (1 + request.fertilizer_change / 100),
+        "pesticides": request.pesticides * (1 + request.pesticides_change / 100),
     }
 
-    X = pd.DataFrame([input_data])
 
-    if encoder is not None:
-        cat_cols = X.select_dtypes(include=["object"]).columns
-        num_cols = X.select_dtypes(exclude=["object"]).columns
+def model_predict(model, X):
+    with stage("predict"):
+        return np.asarray(model.predict(X), dtype=float)
+
+
+def predict_rows(crop, rows):
+    """Run one vectorized predict over feature rows (list of dicts) for a single crop."""
+    model, assembler = resolve_model(crop)
+    if assembler is None:
+        import pandas as pd
+
+        return model_predict(model, pd.DataFrame(rows))
+    with stage("encode"):
+        X = assembler.model_input(model, assembler.transform(rows))
+    return model_predict(model, X)
+
+
+# Trained feature columns (master-table names) each simulation input drives
+INPUT_COLUMNS = {
+    "rainfall": ("Rainfall_x", "Rainfall_y"),  # crop-dataset annual rainfall and IMD state rainfall
+    "fertilizer": ("Fertilizer_Total",),
+    "pesticides": ("Pesticides",),
+}
 
-        if len(cat_cols) > 0:
-            X_cat = encoder.transform(X[cat_cols])
-            X = pd.DataFrame(
-                X_cat,
-                columns=encoder.get_feature_names_out(cat_cols),
-                index=X.index
-            ).join(X[num_cols])
 
-        # Align with training features
-        X = X.reindex(columns=feature_names, fill_value=0)
+def feature_row(request: SimulationRequest, adjusted):
+    row = {"State": request.state, "Year": request.year}
+    for name, columns in INPUT_COLUMNS.items():
+        for col in columns:
+            row[col] = adjusted[name]
+    return row
 
-    prediction = model.predict(X)[0]
 
+def format_result(request: SimulationRequest, adjusted, prediction):
     return {
-        "crop": crop,
+        "crop": request.crop,
         "original_inputs": {
             "rainfall": request.rainfall,
             "fertilizer": request.fertilizer,
@@ -111,10 +128,279 @@ def simulate(request: SimulationRequest):
             "fertilizer_change": request.fertilizer_change,
             "pesticides_change": request.pesticides_change
         },
-        "adjusted_inputs": {
-            "rainfall": adjusted_rainfall,
-            "fertilizer": adjusted_fertilizer,
-            "pesticides": adjusted_pesticides
-        },
+        "adjusted_inputs": adjusted,
         "predicted_yield": float(prediction)
-    }
\ No newline at end of file
+    }
+
+
+async def run_inference(fn, *args):
+    """Run a simulation job on the bounded inference pool; 503 when its queue is full."""
+    try:
+        return await pool.run(fn, *args)
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="Inference queue is full, please retry shortly.",
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+
+# --- Inference jobs (module-level so they can run in a process pool) ---
+def run_batch(items):
+    adjusted = [adjust_inputs(item) for item in items]
+
+    # Group row positions by crop → one encode + one predict per model
+    by_crop = {}
+    for i, item in enumerate(items):
+        by_crop.setdefault(item.crop, []).append(i)
+
+    predictions = [None] * len(items)
+    for crop, positions in by_crop.items():
+        rows = [feature_row(items[i], adjusted[i]) for i in positions]
+        for i, pred in zip(positions, predict_rows(crop, rows)):
+            predictions[i] = pred
+
+    return {
+        "count": len(items),
+        "results": [format_result(item, adj, pred) for item, adj, pred in zip(items, adjusted, predictions)]
+    }
+
+
+async def predict_coalesced(crop, rows):
+    return await run_inference(predict_rows, crop, rows)
+
+
+# Concurrent single simulations for the same crop share one predict
+coalescer = Coalescer(predict_coalesced)
+
+# Repeated simulations (same rounded inputs, same model files) skip the model
+result_cache = ResultCache()
+registry.add_listener(result_cache.invalidate)
+
+
+async def predict_single(request: SimulationRequest, adjusted):
+    if coalescer.enabled:
+        return await coalescer.submit(request.crop, feature_row(request, adjusted))
+    return (await run_inference(predict_rows, request.crop, [feature_row(request, adjusted)]))[0]
+
+
+@router.post("/simulate")
+async def simulate(request: SimulationRequest):
+    adjusted = adjust_inputs(request)
+    if not result_cache.enabled:
+        return format_result(request, adjusted, await predict_single(request, adjusted))
+
+    # Version from the model files on disk, so it works whichever executor loads them;
+    # crops without a model (served by the default model) are not cached
+    version = registry.artifact_version(request.crop)
+    if version is None:
+        return format_result(request, adjusted, await predict_single(request, adjusted))
+
+    key = result_cache.key(request.crop, request.state, request.year, adjusted, version)
+    prediction = result_cache.get(key)
+    if prediction is None:
+        prediction = float(await predict_single(request, adjusted))
+        result_cache.put(key, prediction)
+    return format_result(request, adjusted, prediction)
+
+
+@router.post("/simulate/batch")
+async def simulate_batch(request: BatchSimulationRequest):
+    items = request.requests
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(items)} rows (max {MAX_BATCH_SIZE}).")
+    return await run_inference(run_batch, items)
+
+
+# --- Scenario grid (sensitivity sweep) ---
+GRID_AXES = ("rainfall_change", "fertilizer_change", "pesticides_change")
+
+
+def axis_columns(axis):
+    """Feature columns a grid axis drives: rainfall_change → INPUT_COLUMNS["rainfall"]."""
+    return INPUT_COLUMNS[axis.removesuffix("_change")]
+
+
+def expand_range(name, change: ChangeRange):
+    if change.values is not None:
+        values = np.asarray(change.values, dtype=float)
+    else:
+        if change.step <= 0:
+            raise HTTPException(status_code=422, detail=f"{name}.step must be positive.")
+        if change.stop < change.start:
+            raise HTTPException(status_code=422, detail=f"{name}.stop must be >= start.")
+        # Half-step tolerance keeps `stop` inclusive despite float rounding
+        values = np.arange(change.start, change.stop + change.step / 2, change.step)
+    if values.size == 0:
+        raise HTTPException(status_code=422, detail=f"{name} expands to no values.")
+    return values
+
+
+class ScenarioGrid:
+    """
+    Lazily evaluated Cartesian grid of input changes around one base scenario.
+
+    The encoded base row is computed once; each chunk of grid points is built
+    by repeating it into a NumPy matrix and overwriting the feature columns
+    of each axis (INPUT_COLUMNS), so memory stays bounded by the chunk size
+    rather than the grid size. An axis that sweeps several values but maps to
+    no feature of the crop's model is rejected (422) rather than returned as
+    a flat surface.
+    """
+
+    def __init__(self, request: GridSimulationRequest):
+        self.request = request
+        self.axes = {name: expand_range(name, getattr(request, name)) for name in GRID_AXES}
+        self.shape = tuple(len(v) for v in self.axes.values())
+        self.size = int(np.prod(self.shape))
+        if self.size > MAX_GRID_POINTS:
+            raise HTTPException(status_code=413, detail=f"Grid too large: {self.size} points (max {MAX_GRID_POINTS}).")
+
+        self.model, self.assembler = resolve_model(request.crop)
+        base = SimulationRequest(**request.model_dump(include={"state", "crop", "year", "rainfall", "fertilizer", "pesticides"}))
+        base_row = feature_row(base, adjust_inputs(base))
+        if self.assembler is not None:
+            self.base = self.assembler.transform([base_row])
+            positions = {name: i for i, name in enumerate(self.assembler.feature_names)}
+            self.columns = {axis: [positions[c] for c in axis_columns(axis) if c in positions] for axis in GRID_AXES}
+            for axis, values in self.axes.items():
+                if len(values) > 1 and not self.columns[axis]:
+                    raise HTTPException(status_code=422, detail=(
+                        f"{axis} does not affect the model for crop {request.crop!r} "
+                        f"(it has none of {', '.join(axis_columns(axis))})."))
+        else:
+            import pandas as pd
+
+            self.base = pd.DataFrame([base_row])
+            self.columns = {axis: list(axis_columns(axis)) for axis in GRID_AXES}
+
+    def changes(self, start, stop):
+        """Per-axis change values for flat grid indices [start, stop) (C order)."""
+        idx = np.unravel_index(np.arange(start, stop), self.shape)
+        return {name: values[i] for (name, values), i in zip(self.axes.items(), idx)}
+
+    def predict(self, start, stop):
+        changes = self.changes(start, stop)
+        req = self.request
+        adjusted = {
+            "rainfall_change": req.rainfall * (1 + changes["rainfall_change"] / 100),
+            "fertilizer_change": req.fertilizer * (1 + changes["fertilizer_change"] / 100),
+            "pesticides_change": req.pesticides * (1 + changes["pesticides_change"] / 100),
+        }
+        n = stop - start
+
+        if self.assembler is not None:
+            # All features are numeric after encoding → one float matrix
+            X = np.repeat(self.base, n, axis=0)
+            for axis, values in adjusted.items():
+                for pos in self.columns[axis]:
+                    X[:, pos] = values
+            X = self.assembler.model_input(self.model, X)
+        else:
+            X = self.base.loc[self.base.index.repeat(n)].reset_index(drop=True)
+            for axis, values in adjusted.items():
+                for col in self.columns[axis]:
+                    X[col] = values
+
+        return changes, model_predict(self.model, X)
+
+    def chunks(self, chunk_size):
+        for start in range(0, self.size, chunk_size):
+            stop = min(start + chunk_size, self.size)
+            changes, predictions = self.predict(start, stop)
+            yield start, changes, predictions
+
+    def header(self):
+        return {
+            "crop": self.request.crop,
+            "state": self.request.state,
+            "year": self.request.year,
+            "axes": {name: values.tolist() for name, values in self.axes.items()},
+            "shape": list(self.shape),
+            "size": self.size,
+        }
+
+
+def run_grid(request: GridSimulationRequest):
+    grid = ScenarioGrid(request)
+    surface = np.empty(grid.size, dtype=float)
+    for offset, _, predictions in grid.chunks(request.chunk_size):
+        surface[offset:offset + len(predictions)] = predictions
+
+    # predicted_yield is flattened in C order over (rainfall, fertilizer, pesticides) axes
+    return {**grid.header(), "predicted_yield": surface.tolist()}
+
+
+# Streamed grids built in this process (per worker in process mode), reused for every chunk
+GRID_CACHE_SIZE = 16
+
+
+@functools.lru_cache(maxsize=GRID_CACHE_SIZE)
+def _cached_grid(request_json, version):
+    return ScenarioGrid(GridSimulationRequest.model_validate_json(request_json))
+
+
+def grid_for(request: GridSimulationRequest):
+    """
+    The request's ScenarioGrid, built once per process: jobs carry only the
+    request across process boundaries. Keyed by the model files' version, so
+    a retrained crop gets a fresh grid.
+    """
+    return _cached_grid(request.model_dump_json(), registry.artifact_version(request.crop))
+
+
+def run_grid_header(request: GridSimulationRequest):
+    """Validate the grid and return (size, NDJSON header line)."""
+    grid = grid_for(request)
+    return grid.size, json.dumps(grid.header()) + "\n"
+
+
+def run_grid_chunk(request: GridSimulationRequest, start, stop):
+    """One NDJSON chunk line."""
+    changes, predictions = grid_for(request).predict(start, stop)
+    chunk = {"offset": start, **{k: v.tolist() for k, v in changes.items()}}
+    chunk["predicted_yield"] = predictions.tolist()
+    return json.dumps(chunk) + "\n"
+
+
+# Pause before retrying a stream chunk while the pool is saturated, and how long one chunk may keep waiting
+STREAM_RETRY_SECONDS = 0.05
+STREAM_MAX_WAIT_SECONDS = float(os.getenv("SIMULATE_STREAM_MAX_WAIT_SECONDS", "30"))
+
+
+@router.post("/simulate/grid")
+async def simulate_grid(request: GridSimulationRequest):
+    if request.chunk_size <= 0:
+        raise HTTPException(status_code=422, detail="chunk_size must be positive.")
+
+    if not request.stream:
+        return await run_inference(run_grid, request)
+
+    size, header = await run_inference(run_grid_header, request)
+
+    async def generate():
+        yield header
+        for start in range(0, size, request.chunk_size):
+            stop = min(start + request.chunk_size, size)
+            # The response has started, so a full queue slows the stream instead of failing it,
+            # up to STREAM_MAX_WAIT_SECONDS per chunk; then it ends with an error record
+            deadline = time.monotonic() + STREAM_MAX_WAIT_SECONDS
+            while True:
+                try:
+                    line = await pool.run(run_grid_chunk, request, start, stop)
+                    break
+                except PoolSaturated:
+                    if time.monotonic() >= deadline:
+                        yield json.dumps({"offset": start, "error": "Inference queue is full, stream aborted."}) + "\n"
+                        return
+                    await asyncio.sleep(STREAM_RETRY_SECONDS)
+            yield line
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@router.get("/models/stats")
+def model_registry_stats():
+    return registry.stats()
+
+
+@router.get("/inference/stats")
+def inference_pool_stats():
+    return {**pool.stats(), "coalescer": coalescer.stats(), "result_cache": result_cache.stats()}
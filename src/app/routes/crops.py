@@ -1,18 +1,16 @@
 from fastapi import APIRouter, HTTPException
-from src.app.services.data_loader import load_data
+from src.app.services.data_loader import get_crops
 
 router = APIRouter(tags=["Crops"])
 
 @router.get("/crops")
-def get_crops(state: str = None):
-    df = load_data()
+def get_crops_route(state: str = None):
+    crops = get_crops(state)
 
     if state:
-        crops = df[df["State"].str.lower() == state.lower()]["Crop"].dropna().unique().tolist()
         if not crops:
             raise HTTPException(status_code=404, detail=f"No crops found for state '{state}'.")
     else:
-        crops = df["Crop"].dropna().unique().tolist()
         if not crops:
             raise HTTPException(status_code=404, detail="No crops found in dataset.")
 
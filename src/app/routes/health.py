@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from src.app.services.warmup import readiness
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+def ready():
+    # 503 while warming or degraded (master table not loaded), so the load balancer holds traffic back
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.to_dict())
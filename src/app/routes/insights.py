@@ -0,0 +1,147 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Optional
+import math
+
+router = APIRouter(tags=["Insights"])
+
+
+class AnalysisRequest(BaseModel):
+    state: str
+    crop: str
+    year: Optional[int] = None
+
+
+def get_cubes():
+    # Imported on first use: pandas stays out of the API's import path
+    from src.app.services.analysis_cubes import get_cubes as load_cubes
+    return load_cubes()
+
+
+def _value(v):
+    if hasattr(v, "item"):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    return v
+
+
+def _records(frame):
+    """Rows of a cube slice as JSON-safe dicts (index levels included, NaN → null)."""
+    frame = frame.reset_index()
+    return [{k: _value(v) for k, v in row.items()} for row in frame.to_dict(orient="records")]
+
+
+def _row(frame, key):
+    # .loc[[key]] keeps per-column dtypes (ints stay ints)
+    return {k: _value(v) for k, v in frame.loc[[key]].to_dict(orient="records")[0].items()}
+
+
+def resolve_state(cubes, state):
+    canonical = cubes.states.get(state.strip().lower())
+    if canonical is None:
+        raise HTTPException(status_code=404, detail=f"No data found for state '{state}'.")
+    return canonical
+
+
+def resolve_crop(cubes, crop):
+    canonical = cubes.crops.get(crop.strip().lower())
+    if canonical is None:
+        raise HTTPException(status_code=404, detail=f"No data found for crop '{crop}'.")
+    return canonical
+
+
+def _state_crop_cells(cubes, state, crop):
+    key = (state, crop)
+    if key not in cubes.state_crop.index:
+        raise HTTPException(status_code=404, detail=f"No {crop} records for {state}.")
+    return cubes.cells.loc[key]
+
+
+@router.get("/analysis/trends")
+def yield_trends(crop: str, state: Optional[str] = None,
+                 start_year: Optional[int] = None, end_year: Optional[int] = None):
+    """Yield (and inputs) by year: one state's series, or the cross-state series for a crop."""
+    cubes = get_cubes()
+    crop = resolve_crop(cubes, crop)
+    if state:
+        state = resolve_state(cubes, state)
+        series = _state_crop_cells(cubes, state, crop).drop(columns=["yield_delta", "yield_pct_change"])
+    else:
+        series = cubes.crop_year.loc[crop]
+    series = series.loc[start_year:end_year]
+    return {"crop": crop, "state": state, "series": _records(series)}
+
+
+@router.get("/analysis/aggregates")
+def yield_aggregates(state: Optional[str] = None, crop: Optional[str] = None):
+    """Yield statistics per state × crop, per crop, or for one state/crop pair."""
+    cubes = get_cubes()
+    if state and crop:
+        state, crop = resolve_state(cubes, state), resolve_crop(cubes, crop)
+        _state_crop_cells(cubes, state, crop)
+        return {"state": state, "crop": crop, **_row(cubes.state_crop, (state, crop))}
+    if crop:
+        crop = resolve_crop(cubes, crop)
+        return {
+            "crop": crop,
+            "overall": _row(cubes.crop_summary, crop),
+            "by_state": _records(cubes.state_crop.xs(crop, level="Crop")),
+        }
+    if state:
+        state = resolve_state(cubes, state)
+        return {"state": state, "by_crop": _records(cubes.state_crop.loc[state])}
+    return {"by_crop": _records(cubes.crop_summary)}
+
+
+@router.get("/analysis/yoy")
+def year_over_year(state: str, crop: str, year: Optional[int] = None):
+    """Year-over-year yield change vs the previous year on record."""
+    cubes = get_cubes()
+    state, crop = resolve_state(cubes, state), resolve_crop(cubes, crop)
+    cells = _state_crop_cells(cubes, state, crop)[["yield", "yield_delta", "yield_pct_change"]]
+    if year is not None:
+        if year not in cells.index:
+            raise HTTPException(status_code=404, detail=f"No {crop} record for {state} in {year}.")
+        return {"state": state, "crop": crop, "year": year, **_row(cells, year)}
+    return {"state": state, "crop": crop, "series": _records(cells)}
+
+
+@router.get("/analysis/correlations")
+def input_correlations(crop: str, state: Optional[str] = None):
+    """Pearson correlation of yield with rainfall, fertilizer and pesticides over years."""
+    cubes = get_cubes()
+    crop = resolve_crop(cubes, crop)
+    if state:
+        state = resolve_state(cubes, state)
+        _state_crop_cells(cubes, state, crop)
+        return {"state": state, "crop": crop, **_row(cubes.state_crop_correlations, (state, crop))}
+    return {
+        "crop": crop,
+        "overall": _row(cubes.crop_correlations, crop),
+        "by_state": _records(cubes.state_crop_correlations.xs(crop, level="Crop")),
+    }
+
+
+@router.post("/analysis")
+def analysis_summary(request: AnalysisRequest):
+    """Everything the Insights / Predictive Analysis pages show for one state, crop and year."""
+    cubes = get_cubes()
+    state, crop = resolve_state(cubes, request.state), resolve_crop(cubes, request.crop)
+    cells = _state_crop_cells(cubes, state, crop)
+    stats = _row(cubes.state_crop, (state, crop))
+
+    # Recorded yield for the year if present, otherwise the most recent year on record
+    year = request.year if request.year in cells.index else int(cells.index.max())
+    record = _row(cells, year)
+    return {
+        "state": state,
+        "crop": crop,
+        "year": year,
+        "requested_year": request.year,
+        "yield": record["yield"],
+        "record": record,
+        "statistics": stats,
+        "correlations": _row(cubes.state_crop_correlations, (state, crop)),
+        "trend": _records(cells[["yield"]]),
+    }
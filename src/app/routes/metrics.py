@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from src.app.routes.analysis import coalescer, result_cache
+from src.app.services import metrics
+from src.app.services.inference_pool import pool
+from src.app.services.model_registry import registry
+from src.app.services.warmup import readiness
+
+router = APIRouter(tags=["Metrics"])
+
+
+def collect_service_stats():
+    families = []
+    families += metrics.families_from_stats("crop_api_model_registry", registry.stats(), "Model registry",
+                                            counters=("hits", "misses", "evictions", "reloads"))
+    families += metrics.families_from_stats("crop_api_inference_pool", pool.stats(), "Inference pool",
+                                            {"executor": pool.kind}, counters=("completed", "failed", "rejected"))
+    families += metrics.families_from_stats("crop_api_coalescer", coalescer.stats(), "Simulation coalescer",
+                                            counters=("requests", "batches"))
+    families += metrics.families_from_stats("crop_api_result_cache", result_cache.stats(), "Result cache",
+                                            counters=("hits", "misses", "evictions", "expirations", "invalidations"))
+    families.append(("crop_api_ready", "gauge", "1 once the master table is loaded and every preloaded crop has had a warm-up attempt.",
+                     [({}, int(readiness.ready))]))
+    return families
+
+
+metrics.register_collector(collect_service_stats)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+import os
+
+router = APIRouter(tags=["Records"])
+
+DEFAULT_PAGE_SIZE = int(os.getenv("RECORDS_PAGE_SIZE", "1000"))
+MAX_PAGE_SIZE = int(os.getenv("RECORDS_MAX_PAGE_SIZE", "10000"))
+STREAM_CHUNK_SIZE = int(os.getenv("RECORDS_STREAM_CHUNK_SIZE", "5000"))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def _split(values):
+    """Accept both repeated params (?state=A&state=B) and comma lists (?state=A,B)."""
+    if not values:
+        return None
+    return [v for value in values for v in value.split(",") if v.strip()]
+
+
+@router.get("/records")
+def get_records(
+    state: Optional[List[str]] = Query(None),
+    crop: Optional[List[str]] = Query(None),
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+    columns: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: str = "json",
+):
+    """
+    Master table rows in (State, Crop, Year) order.
+
+    format=json returns one page (`limit`, default RECORDS_PAGE_SIZE) plus
+    `next_cursor`; format=ndjson|arrow streams every matching row (or the
+    first `limit`) chunk by chunk, with the follow-up cursor in X-Next-Cursor.
+    """
+    # Imported on first use: pandas stays out of the API's import path
+    from src.app.services.records import (
+        InvalidCursor, arrow_chunks, decode_cursor, encode_cursor, get_record_table, ndjson_chunks, to_records,
+    )
+
+    if format not in ("json", *MEDIA_TYPES):
+        raise HTTPException(status_code=422, detail=f"Unknown format '{format}' (json, ndjson or arrow).")
+    if limit is not None and limit <= 0:
+        raise HTTPException(status_code=422, detail="limit must be positive.")
+    if format == "json":
+        limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    table = get_record_table()
+    selected = table.columns
+    if columns:
+        selected = [c.strip() for c in columns.split(",") if c.strip()]
+        unknown = [c for c in selected if c not in table.columns]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown column(s): {unknown}. Available: {table.columns}")
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    positions = table.select(_split(state), _split(crop), year_min, year_max, after)
+    total = len(positions)
+    page = positions[:limit] if limit else positions
+    next_cursor = encode_cursor(table.key_at(page[-1])) if len(page) < total else None
+
+    if format == "json":
+        frame = table.frame.iloc[page][selected]
+        return {
+            "columns": selected,
+            "count": len(page),
+            "remaining": total - len(page),
+            "next_cursor": next_cursor,
+            "records": to_records(frame),
+        }
+
+    chunks = ndjson_chunks if format == "ndjson" else arrow_chunks
+    headers = {"X-Total-Count": str(len(page))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return StreamingResponse(chunks(table, page, selected, STREAM_CHUNK_SIZE),
+                             media_type=MEDIA_TYPES[format], headers=headers)
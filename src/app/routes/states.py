@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException
-from src.app.services.data_loader import load_data
+from src.app.services.data_loader import get_states
 
 router = APIRouter(tags=["States"])
 
 @router.get("/states")
-def get_states():
-    df = load_data()
-    states = df["State"].dropna().unique().tolist()
+def get_states_route():
+    states = get_states()
     if not states:
         raise HTTPException(status_code=404, detail="No states found in dataset.")
     return {"states": states}
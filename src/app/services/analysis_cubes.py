@@ -0,0 +1,148 @@
+"""
+Precomputed State × Crop × Year cubes over the cached master table.
+
+Built once per loaded master table (rebuilt automatically when data_loader
+reloads the file), so every /api/analysis query is an index lookup on a
+sorted MultiIndex instead of a groupby over the full frame:
+
+    cells        (State, Crop, Year) → measures + year-over-year yield deltas
+    crop_year    (Crop, Year)        → cross-state yield mean/median/min/max, mean inputs
+    state_crop   (State, Crop)       → yield stats over years, linear trend, latest value
+    crop_summary (Crop,)             → the same stats over every state-year
+    correlations (State, Crop) / (Crop,) → Pearson r of yield vs each input
+
+Rainfall is the crop dataset's annual rainfall (Rainfall_x); fertilizer is
+the state total (Fertilizer_Total).
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.app.services.data_loader import load_data
+from src.app.services.metrics import stage
+
+# API name → master table column
+MEASURES = {
+    "yield": "Yield",
+    "rainfall": "Rainfall_x",
+    "fertilizer": "Fertilizer_Total",
+    "pesticides": "Pesticides",
+}
+INPUTS = ["rainfall", "fertilizer", "pesticides"]
+
+# Correlations over fewer points than this are reported as null
+MIN_CORRELATION_POINTS = 3
+
+
+def _pearson(sums, x, y):
+    """Pearson r from per-group sums (vectorized over groups)."""
+    n = sums["n"]
+    cov = sums[f"{x}*{y}"] - sums[x] * sums[y] / n
+    var_x = sums[f"{x}*{x}"] - sums[x] ** 2 / n
+    var_y = sums[f"{y}*{y}"] - sums[y] ** 2 / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = cov / np.sqrt(var_x * var_y)
+    return r.where((n >= MIN_CORRELATION_POINTS) & (var_x > 0) & (var_y > 0)).clip(-1, 1)
+
+
+def _group_sums(cells, keys):
+    """n, Σ and Σ of products needed for correlations and trend slopes, per group."""
+    frame = cells[["yield", *INPUTS]].copy()
+    frame["year"] = cells.index.get_level_values("Year").astype(float)
+    for col in ["yield", *INPUTS, "year"]:
+        frame[f"{col}*yield"] = frame[col] * frame["yield"]
+    for col in [*INPUTS, "year"]:
+        frame[f"{col}*{col}"] = frame[col] ** 2
+    sums = frame.groupby(level=keys, observed=True, sort=True).sum()
+    sums["n"] = frame.groupby(level=keys, observed=True, sort=True).size()
+    return sums
+
+
+def _yield_stats(cells, keys):
+    grouped = cells.groupby(level=keys, observed=True, sort=True)
+    stats = grouped["yield"].agg(["mean", "std", "min", "max", "count"]).rename(columns={"count": "n_years"})
+    years = cells.index.get_level_values("Year").to_series(index=cells.index)
+    stats["first_year"] = years.groupby(level=keys, observed=True, sort=True).min()
+    stats["last_year"] = years.groupby(level=keys, observed=True, sort=True).max()
+
+    # Least-squares yield trend per year
+    sums = _group_sums(cells, keys)
+    n = sums["n"]
+    var_year = sums["year*year"] - sums["year"] ** 2 / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (sums["year*yield"] - sums["year"] * sums["yield"] / n) / var_year
+    stats["trend_per_year"] = slope.where(var_year > 0)
+    return stats
+
+
+@dataclass(frozen=True)
+class AnalysisCubes:
+    cells: pd.DataFrame
+    crop_year: pd.DataFrame
+    state_crop: pd.DataFrame
+    crop_summary: pd.DataFrame
+    state_crop_correlations: pd.DataFrame
+    crop_correlations: pd.DataFrame
+    states: dict  # lower-cased → canonical name
+    crops: dict
+
+
+def build_cubes(df):
+    cells = df[["State", "Crop", "Year", *MEASURES.values()]].rename(columns={v: k for k, v in MEASURES.items()})
+    cells = cells.astype({"State": str, "Crop": str, "Year": int})
+    cells = cells.set_index(["State", "Crop", "Year"]).sort_index()
+    cells = cells[~cells.index.duplicated(keep="last")]
+
+    # Year-over-year change vs the previous year on record for the same state & crop
+    previous = cells.groupby(level=["State", "Crop"], observed=True)["yield"].shift()
+    cells["yield_delta"] = cells["yield"] - previous
+    cells["yield_pct_change"] = cells["yield_delta"] / previous.where(previous != 0) * 100
+
+    crop_year = cells.groupby(level=["Crop", "Year"], observed=True, sort=True).agg(
+        yield_mean=("yield", "mean"),
+        yield_median=("yield", "median"),
+        yield_min=("yield", "min"),
+        yield_max=("yield", "max"),
+        n_states=("yield", "size"),
+        **{f"{name}_mean": (name, "mean") for name in INPUTS},
+    )
+
+    state_crop = _yield_stats(cells, ["State", "Crop"])
+    latest = cells.groupby(level=["State", "Crop"], observed=True, sort=True)["yield"].last()
+    state_crop["latest_yield"] = latest
+    crop_summary = _yield_stats(cells, ["Crop"])
+
+    def correlations(keys):
+        sums = _group_sums(cells, keys)
+        out = pd.DataFrame({name: _pearson(sums, name, "yield") for name in INPUTS})
+        out["n"] = sums["n"]
+        return out
+
+    return AnalysisCubes(
+        cells=cells,
+        crop_year=crop_year,
+        state_crop=state_crop,
+        crop_summary=crop_summary,
+        state_crop_correlations=correlations(["State", "Crop"]),
+        crop_correlations=correlations(["Crop"]),
+        states={s.lower(): s for s in cells.index.get_level_values("State").unique()},
+        crops={c.lower(): c for c in cells.index.get_level_values("Crop").unique()},
+    )
+
+
+# Cubes for the master table currently cached by data_loader (identity-checked)
+_lock = threading.Lock()
+_cubes = {"source": None, "cubes": None}
+
+
+def get_cubes():
+    df = load_data()
+    if _cubes["source"] is not df:
+        with _lock:
+            if _cubes["source"] is not df:
+                with stage("cube_build"):
+                    _cubes["cubes"] = build_cubes(df)
+                _cubes["source"] = df
+    return _cubes["cubes"]
@@ -0,0 +1,92 @@
+"""
+Micro-batching for single-row simulations.
+
+Concurrent `/api/simulate` calls for the same crop are held for up to
+`window_seconds` (or until `max_batch` rows are waiting), then run as one
+vectorized predict; each caller gets its own row's result back. Only calls
+that arrive while a batch is already running wait: an idle service runs a
+request at once, so sparse traffic pays no window. A longer window trades a
+little latency for bigger batches under load.
+"""
+import asyncio
+import os
+import threading
+
+WINDOW_MS = float(os.getenv("SIMULATE_COALESCE_WINDOW_MS", "2"))  # 0 disables coalescing
+MAX_BATCH = int(os.getenv("SIMULATE_COALESCE_MAX_BATCH", "64"))
+
+
+class Coalescer:
+    """
+    Groups `submit(key, item)` calls by key. `run_batch(key, items)` is an
+    async callable returning one result per item, in order; if it raises,
+    every caller in the batch gets the exception.
+    """
+
+    def __init__(self, run_batch, window_seconds=WINDOW_MS / 1000, max_batch=MAX_BATCH):
+        self.run_batch = run_batch
+        self.window_seconds = window_seconds
+        self.max_batch = max(1, max_batch)
+        self._pending = {}  # key → (items, futures, timer handle)
+        self._tasks = set()  # running batches (the loop only keeps weak references)
+        self._lock = threading.Lock()  # guards the counters, read from other threads by stats()
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+
+    @property
+    def enabled(self):
+        return self.window_seconds > 0 and self.max_batch > 1
+
+    async def submit(self, key, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.get(key)
+        if pending is None:
+            # Idle (no batch running): nothing to batch with, so don't wait for the window
+            timer = loop.call_later(self.window_seconds, self._flush, key) if self._tasks else None
+            pending = self._pending[key] = ([], [], timer)
+        items, futures, timer = pending
+        items.append(item)
+        futures.append(future)
+
+        if timer is None or len(items) >= self.max_batch:
+            if timer is not None:
+                timer.cancel()
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        items, futures, _ = self._pending.pop(key)
+        with self._lock:
+            self.requests += len(items)
+            self.batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, len(items))
+        task = asyncio.get_running_loop().create_task(self._run(key, items, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key, items, futures):
+        try:
+            results = await self.run_batch(key, items)
+        except Exception as exc:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():  # caller may have gone away
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "window_ms": self.window_seconds * 1000,
+                "max_batch": self.max_batch,
+                "requests": self.requests,
+                "batches": self.batches,
+                "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+                "max_batch_seen": self.max_batch_seen,
+            }
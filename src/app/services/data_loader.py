@@ -1,17 +1,118 @@
-import pandas as pd
+import os
+import threading
+from dataclasses import dataclass, field
+
 from fastapi import HTTPException
 
+from src.app.services.metrics import stage
+
 DATA_PATH = "data/final/master_table.csv"
 
-def load_data():
+
+@dataclass(frozen=True)
+class MasterIndex:
+    """Lookup structures precomputed once per loaded master table."""
+    states: tuple = ()
+    crops: tuple = ()
+    crops_by_state: dict = field(default_factory=dict)  # lower-cased state → tuple of crops
+
+
+# Process-wide cache: one parsed copy of the master table, keyed by file (mtime, size)
+_cache_lock = threading.Lock()
+_cache = {"entry": None}  # (signature, df, index), swapped atomically
+
+
+def _file_signature(path):
     try:
-        df = pd.read_csv(DATA_PATH)
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail=f"Dataset not found at {path}.")
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_master():
+    # pandas/pyarrow are imported on first load, not when the API module is imported
+    import pandas as pd
+    from src.data_preprocessing.storage import read_table
+
+    try:
+        df = read_table(DATA_PATH)
         if df.empty:
             raise HTTPException(status_code=500, detail="Master dataset is empty.")
         return df
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail=f"Dataset not found at {DATA_PATH}.")
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=500, detail="Dataset file is empty.")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
+
+
+def _build_index(df):
+    """Precompute sorted states and per-state crop lists (first-seen order)."""
+    states = tuple(sorted(df["State"].dropna().unique().tolist()))
+    crops = tuple(df["Crop"].dropna().unique().tolist())
+
+    crops_by_state = {}
+    pairs = df[["State", "Crop"]].dropna().drop_duplicates()
+    for state, crop in zip(pairs["State"], pairs["Crop"]):
+        crops_by_state.setdefault(str(state).lower(), []).append(crop)
+
+    return MasterIndex(
+        states=states,
+        crops=crops,
+        crops_by_state={k: tuple(v) for k, v in crops_by_state.items()},
+    )
+
+
+def _ensure_loaded():
+    """Return (df, index), reloading only when the file on disk has changed."""
+    from src.data_preprocessing.storage import resolve_path
+
+    signature = _file_signature(resolve_path(DATA_PATH))
+    entry = _cache["entry"]
+    if entry is not None and entry[0] == signature:
+        return entry[1], entry[2]
+
+    with _cache_lock:
+        # Another thread may have reloaded while we waited
+        entry = _cache["entry"]
+        if entry is None or entry[0] != signature:
+            with stage("data_load"):
+                df = _read_master()
+                entry = (signature, df, _build_index(df))
+            _cache["entry"] = entry
+        return entry[1], entry[2]
+
+
+def load_data():
+    """
+    Return the cached master table. Callers share one copy and must not
+    modify it in place (use .copy() first).
+    """
+    df, _ = _ensure_loaded()
+    return df
+
+
+def get_index():
+    _, index = _ensure_loaded()
+    return index
+
+
+def get_states():
+    return list(get_index().states)
+
+
+def get_crops(state=None):
+    index = get_index()
+    if state:
+        return list(index.crops_by_state.get(state.lower(), ()))
+    return list(index.crops)
+
+
+def clear_cache():
+    """Drop the cached table (next access re-reads from disk)."""
+    with _cache_lock:
+        _cache["entry"] = None
@@ -0,0 +1,72 @@
+"""
+Request → model-input assembly without pandas.
+
+Built once per loaded model from the fitted OneHotEncoder and the saved
+training feature order: every categorical value and numeric field is mapped
+to its column index up front, so a request becomes a zero row with a few
+slots set. Matches `encoder.transform` + `reindex(feature_names, fill_value=0)`:
+unknown categories and fields absent from the training features are ignored,
+training features the request does not provide stay 0.
+"""
+import numpy as np
+
+
+class FeatureAssembler:
+    def __init__(self, feature_names, categorical_columns=(), categories=()):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        positions = {name: i for i, name in enumerate(self.feature_names)}
+
+        # column → {category value → feature index}; one-hot names follow sklearn's "<col>_<category>"
+        self.categorical = {}
+        for col, cats in zip(categorical_columns, categories):
+            lookup = {}
+            for cat in cats:
+                pos = positions.get(f"{col}_{cat}")
+                if pos is not None:
+                    lookup[cat] = pos
+            self.categorical[col] = lookup
+
+        one_hot = {pos for lookup in self.categorical.values() for pos in lookup.values()}
+        self.numeric = {name: pos for name, pos in positions.items() if pos not in one_hot}
+
+    @classmethod
+    def from_encoder(cls, encoder, feature_names):
+        columns = list(getattr(encoder, "feature_names_in_", []))
+        return cls(feature_names, columns, [list(c) for c in encoder.categories_])
+
+    def transform(self, rows):
+        """Encode rows (list of dicts keyed by raw column name) into an (n, n_features) float matrix."""
+        n = len(rows)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+        if n == 1:
+            row = rows[0]
+            for col, lookup in self.categorical.items():
+                pos = lookup.get(row.get(col))
+                if pos is not None:
+                    X[0, pos] = 1.0
+            for name, pos in self.numeric.items():
+                if name in row:
+                    X[0, pos] = row[name]
+            return X
+
+        for col, lookup in self.categorical.items():
+            idx = np.fromiter((lookup.get(row.get(col), -1) for row in rows), dtype=np.int64, count=n)
+            hit = idx >= 0
+            X[np.flatnonzero(hit), idx[hit]] = 1.0
+        # Rows may carry different optional fields: a field is set per row, 0 where a row lacks it
+        for name, pos in self.numeric.items():
+            if any(name in row for row in rows):
+                X[:, pos] = [row.get(name, 0.0) for row in rows]
+        return X
+
+    def model_input(self, model, X):
+        """
+        Models fitted on DataFrames (sklearn/XGBoost) get named columns so they
+        don't warn about missing feature names; array models take X as is.
+        """
+        if hasattr(model, "feature_names_in_"):
+            import pandas as pd  # only sklearn/XGBoost models need it; they import pandas anyway
+
+            return pd.DataFrame(X, columns=self.feature_names, copy=False)
+        return X
@@ -0,0 +1,148 @@
+"""
+Dedicated, bounded executor for model inference.
+
+Simulation handlers hand their CPU-bound work to this pool instead of
+FastAPI's default threadpool, so a burst of simulations cannot starve the
+cheap routes (/api/states, /api/crops). At most `workers` jobs run and
+`max_queue` more wait; beyond that `run` raises `PoolSaturated` and the
+route answers 503 with Retry-After.
+
+INFERENCE_EXECUTOR=process runs jobs in worker processes (each with its own
+model registry); jobs must then be picklable module-level functions.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+EXECUTOR_KIND = os.getenv("INFERENCE_EXECUTOR", "thread")  # "thread" or "process"
+WORKERS = int(os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "64"))  # waiting jobs beyond the running ones
+RETRY_AFTER_SECONDS = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class _RemoteHTTPError:
+    """HTTPException doesn't survive pickling; carried back from worker processes as plain data."""
+
+    def __init__(self, status_code, detail):
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _run_in_process(fn, args):
+    try:
+        return fn(*args)
+    except HTTPException as exc:
+        return _RemoteHTTPError(exc.status_code, exc.detail)
+
+
+class InferencePool:
+    def __init__(self, kind=EXECUTOR_KIND, workers=WORKERS, max_queue=MAX_QUEUE):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor: {kind!r} (expected 'thread' or 'process')")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0  # queued + running
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_in_flight_seen = 0
+
+    @property
+    def capacity(self):
+        return self.workers + self.max_queue
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.kind == "process":
+                # Not fork: the API process already runs threads (warm-up loads, pyarrow), and
+                # a forked child can inherit one of their locks held and hang on first use
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inference")
+        return self._executor
+
+    def _reserve(self):
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                self.rejected += 1
+                raise PoolSaturated()
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+
+    def _release(self, future):
+        ok = not future.cancelled() and future.exception() is None \
+            and not isinstance(future.result(), _RemoteHTTPError)
+        with self._lock:
+            self.in_flight -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _track_running(self, fn, args):
+        # Thread mode only: tracks how many jobs are actually executing vs queued
+        with self._lock:
+            self.running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool; raises PoolSaturated when the queue is full."""
+        self._reserve()
+        try:
+            if self.kind == "process":
+                future = self._get_executor().submit(_run_in_process, fn, args)
+            else:
+                future = self._get_executor().submit(self._track_running, fn, args)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        # Released when the job finishes, not when the caller stops waiting (e.g. client disconnect)
+        future.add_done_callback(self._release)
+
+        result = await asyncio.wrap_future(future)
+        if isinstance(result, _RemoteHTTPError):
+            raise HTTPException(status_code=result.status_code, detail=result.detail)
+        return result
+
+    def stats(self):
+        with self._lock:
+            running = self.running if self.kind == "thread" else min(self.in_flight, self.workers)
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "running": running,
+                "queue_depth": self.in_flight - running,
+                "max_in_flight_seen": self.max_in_flight_seen,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide pool used by the API routes
+pool = InferencePool()
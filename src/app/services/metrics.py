@@ -0,0 +1,144 @@
+"""
+Minimal Prometheus-style metrics (text exposition format 0.0.4), no extra dependency.
+
+    with stage("predict"):          # per-stage latency histogram
+        ...
+    REQUESTS.inc(method="GET", route="/api/states", status="200")
+    register_collector(fn)          # fn() → [(name, type, help, [(labels, value), ...])]
+
+Stages recorded in INFERENCE_EXECUTOR=process workers stay in those
+processes; only the parent's stages appear on /metrics.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; fine-grained at the low end for encode/predict stages
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in labels.values())
+    return "{" + ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.label_names, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label key → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.label_names, key))
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series[-1]}")
+        return lines
+
+
+REQUESTS = Counter("crop_api_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("crop_api_request_duration_seconds", "HTTP request latency (until the response starts).",
+                            ("method", "route"))
+STAGE_SECONDS = Histogram("crop_api_stage_duration_seconds",
+                          "Latency of internal stages (data_load, model_load, encode, predict, ...).", ("stage",))
+SLOW_PROFILES = Counter("crop_api_slow_request_profiles_total", "Profiles dumped for slow requests.", ("route",))
+
+_METRICS = [REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, SLOW_PROFILES]
+_collectors = []
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=name)
+
+
+def register_collector(collect):
+    """collect() → iterable of (name, type, help, [(labels dict, value), ...]), called at scrape time."""
+    _collectors.append(collect)
+
+
+def families_from_stats(prefix, stats, help_text, labels=None, counters=()):
+    """
+    Numeric entries of a stats() dict as families named <prefix>_<key>:
+    gauges, except the monotonic `counters` keys (counter, <prefix>_<key>_total).
+    """
+    families = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            families.append((f"{prefix}_{key}_total", "counter", f"{help_text}: {key}", [(labels or {}, value)]))
+        else:
+            families.append((f"{prefix}_{key}", "gauge", f"{help_text}: {key}", [(labels or {}, value)]))
+    return families
+
+
+def render():
+    lines = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        try:
+            families = list(collect())
+        except Exception:
+            continue  # a broken collector must not take /metrics down
+        for name, kind, help_text, samples in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
@@ -7,7 +7,6 @@ import numpy as np
 import re  # add this
 
 MODEL_PATH = "models/"
-os.makedirs(MODEL_PATH, exist_ok=True)
 
 # Encode states for models
 def encode_states(df):
@@ -54,6 +53,7 @@ def train_crop_model(df, crop_name):
     
     # Save model (sanitize filename)
     safe_name = crop_name.replace("/", "_").replace("\\", "_")
+    os.makedirs(MODEL_PATH, exist_ok=True)
     joblib.dump(model, f"{MODEL_PATH}{safe_name}_model.pkl")
     
     return state_map
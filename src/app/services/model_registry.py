@@ -0,0 +1,272 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.app.services.feature_assembler import FeatureAssembler
+from src.app.services.metrics import stage
+from src.utils.compact_forest import CompactForest
+from src.utils.model_bundle import BundleFile, bundle_path
+
+MODELS_DIR = "models"
+CONFIG_PATH = os.path.join(MODELS_DIR, "model_config.json")
+
+# Registry limits (override via environment)
+MAX_BUNDLES = int(os.getenv("MODEL_REGISTRY_MAX_BUNDLES", "32"))
+MAX_BYTES = int(os.getenv("MODEL_REGISTRY_MAX_BYTES", "0"))  # 0 → no byte budget
+CHECK_INTERVAL = float(os.getenv("MODEL_REGISTRY_CHECK_INTERVAL", "2.0"))  # seconds between mtime checks
+USE_COMPACT = os.getenv("MODEL_REGISTRY_USE_COMPACT", "1") == "1"  # prefer export_compact_models.py output
+
+
+def safe_crop_name(crop):
+    return crop.replace("/", "_")
+
+
+def crop_artifact_paths(crop, models_dir=MODELS_DIR):
+    """
+    Paths of the per-crop files written by train_per_crop.py: the single
+    `.bundle` file if present, else the legacy three-pickle layout.
+    """
+    bundle = bundle_path(models_dir, crop)
+    if os.path.exists(bundle):
+        return {"bundle": bundle}
+
+    safe_name = safe_crop_name(crop)
+    crop_dir = os.path.join(models_dir, safe_name)
+    return {
+        "model": os.path.join(crop_dir, f"{safe_name}_random_forest.pkl"),
+        "encoder": os.path.join(crop_dir, f"{safe_name}_encoder.pkl"),
+        "features": os.path.join(crop_dir, f"{safe_name}_features.pkl"),
+        # Optional: written by export_compact_models.py
+        "compact_meta": os.path.join(crop_dir, f"{safe_name}_random_forest.compact.json"),
+        "compact_nodes": os.path.join(crop_dir, f"{safe_name}_random_forest.compact.npy"),
+    }
+
+
+OPTIONAL_ARTIFACTS = ("compact_meta", "compact_nodes")
+
+
+def _signature(paths):
+    """
+    (mtime_ns, size) of every artifact (None for absent optional ones);
+    raises FileNotFoundError if a required artifact is missing.
+    """
+    sig = []
+    for key, path in paths.items():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if key in OPTIONAL_ARTIFACTS:
+                sig.append(None)
+                continue
+            raise
+        sig.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(sig)
+
+
+def _compact_is_current(paths):
+    """Compact files exist and were exported after the pickle was last written."""
+    try:
+        return min(os.path.getmtime(paths["compact_meta"]), os.path.getmtime(paths["compact_nodes"])) \
+            >= os.path.getmtime(paths["model"])
+    except FileNotFoundError:
+        return False
+
+
+class ModelBundle:
+    """A loaded per-crop model together with its encoder, feature order and feature assembler."""
+
+    def __init__(self, crop, model, encoder, feature_names, signature, size_bytes):
+        self.crop = crop
+        self.model = model
+        self.encoder = encoder
+        self.feature_names = feature_names
+        self.assembler = FeatureAssembler.from_encoder(encoder, feature_names)
+        self.signature = signature
+        self.size_bytes = size_bytes
+        self.checked_at = time.monotonic()
+
+
+class ModelRegistry:
+    """
+    LRU cache of per-crop model bundles.
+
+    Bundles are evicted once more than `max_bundles` are resident or their
+    combined on-disk size exceeds `max_bytes`. A cached bundle is reloaded
+    when its files' mtime/size change (checked at most every `check_interval`
+    seconds), so a retrain is picked up without restarting the API.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, max_bundles=MAX_BUNDLES,
+                 max_bytes=MAX_BYTES, check_interval=CHECK_INTERVAL, use_compact=USE_COMPACT):
+        self.models_dir = models_dir
+        self.use_compact = use_compact
+        self.max_bundles = max_bundles
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self._bundles = OrderedDict()
+        self._lock = threading.Lock()
+        self._listeners = []  # called with the crop (or None for all) when bundles are dropped/reloaded
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    def _load_bundle(self, crop, path, signature):
+        bundle = BundleFile(path)
+        model = bundle.compact("random_forest") if self.use_compact else None
+        section = "random_forest_compact"
+        if model is None:
+            model = bundle.load("random_forest")
+            section = "random_forest"
+        size_bytes = bundle.sections[section]["length"]
+        return ModelBundle(crop, model, bundle.encoder(), bundle.feature_names, signature, size_bytes)
+
+    def _load(self, crop, paths, signature):
+        if "bundle" in paths:
+            return self._load_bundle(crop, paths["bundle"], signature)
+
+        import joblib
+
+        encoder = joblib.load(paths["encoder"])
+        feature_names = joblib.load(paths["features"])
+
+        if self.use_compact and _compact_is_current(paths):
+            # Memory-mapped node arrays: the sklearn forest is never unpickled
+            model = CompactForest.load(paths["compact_meta"][:-len(".json")])
+            skip = {"model"}
+        else:
+            model = joblib.load(paths["model"])
+            skip = set(OPTIONAL_ARTIFACTS)
+
+        size_bytes = sum(s[1] for key, s in zip(paths, signature) if s is not None and key not in skip)
+        return ModelBundle(crop, model, encoder, feature_names, signature, size_bytes)
+
+    def _is_fresh(self, bundle, paths):
+        now = time.monotonic()
+        if now - bundle.checked_at < self.check_interval:
+            return True
+        try:
+            fresh = _signature(paths) == bundle.signature
+        except FileNotFoundError:
+            # Files removed mid-retrain: keep serving what we have
+            fresh = True
+        bundle.checked_at = now
+        return fresh
+
+    def add_listener(self, callback):
+        """Register callback(crop) to run when a crop's bundle is reloaded or invalidated."""
+        self._listeners.append(callback)
+
+    def _notify(self, crop):
+        for callback in self._listeners:
+            callback(crop)
+
+    def get(self, crop):
+        """Return the bundle for `crop`, loading it on a miss. Raises FileNotFoundError."""
+        paths = crop_artifact_paths(crop, self.models_dir)
+
+        with self._lock:
+            bundle = self._bundles.get(crop)
+            stale = bundle is not None
+            if bundle is not None:
+                if self._is_fresh(bundle, paths):
+                    self._bundles.move_to_end(crop)
+                    self.hits += 1
+                    return bundle
+                self.reloads += 1
+            self.misses += 1
+
+        if stale:
+            self._notify(crop)
+
+        # Unpickle outside the lock so other crops keep being served
+        signature = _signature(paths)
+        with stage("model_load"):
+            bundle = self._load(crop, paths, signature)
+
+        with self._lock:
+            self._bundles[crop] = bundle
+            self._bundles.move_to_end(crop)
+            self._evict()
+        return bundle
+
+    def _evict(self):
+        while len(self._bundles) > 1 and (
+            (self.max_bundles and len(self._bundles) > self.max_bundles)
+            or (self.max_bytes and self.resident_bytes() > self.max_bytes)
+        ):
+            self._bundles.popitem(last=False)
+            self.evictions += 1
+
+    def artifact_version(self, crop):
+        """
+        Signature of `crop`'s model files on disk, without loading them (the
+        parent process never loads bundles when inference runs in worker
+        processes); None if the crop has no model.
+        """
+        try:
+            return _signature(crop_artifact_paths(crop, self.models_dir))
+        except FileNotFoundError:
+            return None
+
+    def resident_bytes(self):
+        return sum(b.size_bytes for b in self._bundles.values())
+
+    def invalidate(self, crop=None):
+        """Drop one crop (or everything) from the registry."""
+        with self._lock:
+            if crop is None:
+                self._bundles.clear()
+            else:
+                self._bundles.pop(crop, None)
+        self._notify(crop)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "resident": len(self._bundles),
+                "resident_bytes": self.resident_bytes(),
+                "max_bundles": self.max_bundles,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "crops": list(self._bundles.keys()),
+            }
+
+
+# Process-wide registry used by the API routes
+registry = ModelRegistry()
+
+
+# --- Default model (global fallback if a per-crop model is missing) ---
+_default_lock = threading.Lock()
+_default = {}  # "model" → loaded model or None, set on first use
+
+
+def load_default_model():
+    if os.path.exists(CONFIG_PATH):
+        with open(CONFIG_PATH, "r") as f:
+            config = json.load(f)
+        model_file = config.get("default_model", "best_model.pkl")
+    else:
+        model_file = "best_model.pkl"  # fallback
+
+    model_path = os.path.join(MODELS_DIR, model_file)
+    if os.path.exists(model_path):
+        import joblib
+
+        return joblib.load(model_path)
+    return None
+
+
+def get_default_model():
+    """The default model, loaded on first use (or by the startup warm-up), or None."""
+    if "model" not in _default:
+        with _default_lock:
+            if "model" not in _default:
+                _default["model"] = load_default_model()
+    return _default["model"]
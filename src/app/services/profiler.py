@@ -0,0 +1,114 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+Enabled with PROFILE_SLOW_REQUESTS_MS > 0. A PROFILE_SAMPLE_RATE fraction of
+requests (or, with PROFILE_ALLOW_FORCE=1, any request sent with
+`X-Profile: 1`) is sampled: a background thread records every thread's
+Python stack each PROFILE_INTERVAL_MS. If the request took at least the
+threshold (always, for X-Profile), the samples are written to PROFILE_DIR as
+collapsed stacks (``frame;frame;frame count``), loadable in speedscope or
+flamegraph.pl. At most one profile is written per PROFILE_MIN_DUMP_INTERVAL_S,
+so clients cannot fill the disk.
+
+All threads are sampled because the work runs on inference-pool threads,
+not the request's own; concurrent requests therefore show up too.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+SLOW_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))  # 0 disables profiling
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("reports", "profiles"))
+ALLOW_FORCE = os.getenv("PROFILE_ALLOW_FORCE", "0") == "1"  # honour X-Profile: 1 from clients
+MIN_DUMP_INTERVAL_S = float(os.getenv("PROFILE_MIN_DUMP_INTERVAL_S", "10"))
+FORCE_HEADER = "x-profile"
+
+_dump_lock = threading.Lock()
+_last_dump = {"at": None}
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    def __init__(self, interval_seconds=INTERVAL_MS / 1000):
+        self.interval = interval_seconds
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def is_forced(headers):
+    return ALLOW_FORCE and headers.get(FORCE_HEADER) == "1"
+
+
+def should_profile(headers):
+    if SLOW_MS <= 0:
+        return False
+    return is_forced(headers) or random.random() < SAMPLE_RATE
+
+
+def _claim_dump_slot():
+    with _dump_lock:
+        now = time.monotonic()
+        if _last_dump["at"] is not None and now - _last_dump["at"] < MIN_DUMP_INTERVAL_S:
+            return False
+        _last_dump["at"] = now
+        return True
+
+
+def finish(profiler, elapsed_seconds, method, route, forced=False):
+    """
+    Stop sampling; dump the profile if the request was slow (or forced) and
+    the dump rate limit allows. Returns the path or None. Blocking (thread
+    join + file write): call it off the event loop.
+    """
+    profiler.stop()
+    elapsed_ms = elapsed_seconds * 1000
+    if not forced and elapsed_ms < SLOW_MS:
+        return None
+    if not _claim_dump_slot():
+        return None
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}_{method}_{slug}_{elapsed_ms:.0f}ms.folded")
+    profiler.dump(path)
+    return path
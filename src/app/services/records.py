@@ -0,0 +1,129 @@
+"""
+Filtered, paginated access to the raw master table rows.
+
+Rows are served in (State, Crop, Year) order, a unique key, so a cursor is
+just the key of the last row returned: pages stay consistent even if the
+table is reloaded between requests. Filters are evaluated on precomputed
+code/year arrays (one vectorized mask), and output is produced chunk by
+chunk so NDJSON/Arrow exports never materialize the full response.
+"""
+import base64
+import io
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.app.services.data_loader import load_data
+from src.app.services.metrics import stage
+
+KEY = ["State", "Crop", "Year"]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key):
+    state, crop, year = key
+    raw = json.dumps([str(state), str(crop), int(year)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state, crop, year = json.loads(base64.urlsafe_b64decode(padded))
+        return str(state), str(crop), int(year)
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+class RecordTable:
+    """The master table sorted by key, with lower-cased name → code lookups for filtering."""
+
+    def __init__(self, df):
+        table = df.astype({"State": str, "Crop": str}).sort_values(KEY, kind="stable").reset_index(drop=True)
+        self.frame = table
+        self.columns = list(table.columns)
+        self.index = pd.MultiIndex.from_frame(table[KEY])
+
+        self.state_codes, states = pd.factorize(table["State"])
+        self.crop_codes, crops = pd.factorize(table["Crop"])
+        self.state_lookup = {s.lower(): i for i, s in enumerate(states)}
+        self.crop_lookup = {c.lower(): i for i, c in enumerate(crops)}
+        self.years = table["Year"].to_numpy()
+
+    def _codes(self, names, lookup):
+        # Unknown names match nothing (code -1 never occurs)
+        return [lookup.get(n.strip().lower(), -1) for n in names]
+
+    def select(self, states=None, crops=None, year_min=None, year_max=None, after=None):
+        """Positions of matching rows, in key order, strictly after the `after` key."""
+        mask = np.ones(len(self.frame), dtype=bool)
+        if states:
+            mask &= np.isin(self.state_codes, self._codes(states, self.state_lookup))
+        if crops:
+            mask &= np.isin(self.crop_codes, self._codes(crops, self.crop_lookup))
+        if year_min is not None:
+            mask &= self.years >= year_min
+        if year_max is not None:
+            mask &= self.years <= year_max
+
+        positions = np.flatnonzero(mask)
+        if after is not None:
+            start = self.index.slice_locs(start=after)[0]
+            if start < len(self.index) and self.index[start] == after:
+                start += 1
+            positions = positions[np.searchsorted(positions, start):]
+        return positions
+
+    def key_at(self, position):
+        return self.index[position]
+
+    def chunks(self, positions, columns, chunk_size):
+        for i in range(0, len(positions), chunk_size):
+            yield self.frame.iloc[positions[i:i + chunk_size]][columns]
+
+
+def to_records(frame):
+    """JSON-safe list of dicts (NaN → None). Not DataFrame.to_json: it rounds floats to 10 digits."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict(orient="records")
+
+
+def ndjson_chunks(table, positions, columns, chunk_size):
+    for chunk in table.chunks(positions, columns, chunk_size):
+        yield "".join(json.dumps(row) + "\n" for row in to_records(chunk))
+
+
+def arrow_chunks(table, positions, columns, chunk_size):
+    """Arrow IPC stream: schema message first, then one record batch per chunk."""
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(table.frame[columns].iloc[:0], preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for chunk in table.chunks(positions, columns, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()  # end-of-stream marker
+
+
+# Record table for the master table currently cached by data_loader (identity-checked)
+_lock = threading.Lock()
+_tables = {"source": None, "table": None}
+
+
+def get_record_table():
+    df = load_data()
+    if _tables["source"] is not df:
+        with _lock:
+            if _tables["source"] is not df:
+                with stage("records_index"):
+                    _tables["table"] = RecordTable(df)
+                _tables["source"] = df
+    return _tables["table"]
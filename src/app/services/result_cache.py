@@ -0,0 +1,96 @@
+"""
+TTL + LRU cache of single-simulation predictions.
+
+Keys are (crop, state, year, adjusted rainfall/fertilizer/pesticides rounded
+to `precision` decimals, model version), so re-posting the same slider
+position is answered without touching the model. The model version is the
+registry's file signature for the crop, so a retrained bundle never serves
+old results; the registry also purges a crop's entries when it reloads it.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))  # 0 disables the cache
+TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "300"))
+PRECISION = int(os.getenv("RESULT_CACHE_PRECISION", "2"))  # decimals kept on adjusted inputs
+
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl_seconds=TTL_SECONDS, precision=PRECISION):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self._entries = OrderedDict()  # key → (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key(self, crop, state, year, adjusted, version):
+        return (
+            crop, state, year,
+            round(adjusted["rainfall"], self.precision),
+            round(adjusted["fertilizer"], self.precision),
+            round(adjusted["pesticides"], self.precision),
+            version,
+        )
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, crop=None):
+        """Drop every entry for `crop` (or all entries)."""
+        with self._lock:
+            if crop is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [k for k in self._entries if k[0] == crop]
+                for k in stale:
+                    del self._entries[k]
+                dropped = len(stale)
+            self.invalidations += dropped
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "precision": self.precision,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
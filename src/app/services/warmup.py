@@ -0,0 +1,158 @@
+"""
+Startup warm-up: preload per-crop model bundles and run a dummy predict so
+the first real request for a crop doesn't pay the load cost.
+
+PRELOAD_MODELS selects what to warm: "all" (default), "0" (nothing), or N
+for the N crops with the most training rows; PRELOAD_CROPS (comma-separated)
+names crops explicitly. At most the registry's bundle limit is preloaded.
+Loads run as jobs on the inference pool. In process mode each crop is warmed
+in whichever worker picks up its job; the other workers still load it on
+first use.
+
+The instance reports "ready" once the master table and its cubes are loaded
+and every selected crop has had one warm-up attempt. Until the master table
+loads it is "degraded" (503 like "warming") and the load is retried every
+WARMUP_RETRY_SECONDS. A crop or default-model failure doesn't hold readiness
+back: it is listed under "errors" and the crop is retried up to
+WARMUP_CROP_RETRIES times (a crop that never warms just loads on first use).
+"""
+import asyncio
+import json
+import os
+import time
+
+from src.app.services.data_loader import load_data
+from src.app.services.inference_pool import pool
+from src.app.services.model_registry import get_default_model, registry
+
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "all")
+PRELOAD_CROPS = [c.strip() for c in os.getenv("PRELOAD_CROPS", "").split(",") if c.strip()]
+WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+WARMUP_CROP_RETRIES = int(os.getenv("WARMUP_CROP_RETRIES", "3"))
+
+
+class Readiness:
+    def __init__(self):
+        self.status = "starting"  # starting → warming | degraded → ready
+        self.crops_total = 0
+        self.crops_loaded = 0
+        self.errors = {}
+        self.seconds = None
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def to_dict(self):
+        return {
+            "status": self.status,
+            "crops_total": self.crops_total,
+            "crops_loaded": self.crops_loaded,
+            "errors": self.errors,
+            "warmup_seconds": self.seconds,
+        }
+
+
+readiness = Readiness()
+
+
+def trained_crops(models_dir=registry.models_dir):
+    """(crop, training rows) for every crop with saved models, from the per-crop manifests."""
+    crops = []
+    if not os.path.isdir(models_dir):
+        return crops
+    for name in sorted(os.listdir(models_dir)):
+        manifest_path = os.path.join(models_dir, name, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            crops.append((manifest["crop"], manifest.get("rows", 0)))
+        elif os.path.isdir(os.path.join(models_dir, name)):
+            crops.append((name, 0))  # legacy layout: directory name is the crop
+    return crops
+
+
+def crops_to_preload(spec=PRELOAD_MODELS, explicit=PRELOAD_CROPS, limit=None):
+    """Crops to warm; raises ValueError for a malformed PRELOAD_MODELS (checked before warm-up starts)."""
+    spec = spec.strip().lower()
+    if spec not in ("all", "0", "none", "false", "") and not spec.isdigit():
+        raise ValueError(f"PRELOAD_MODELS must be 'all', '0' or a number of crops, got {spec!r}")
+    if explicit:
+        crops = list(explicit)
+    elif spec in ("0", "none", "false", ""):
+        return []
+    else:
+        ranked = sorted(trained_crops(), key=lambda c: c[1], reverse=True)
+        crops = [crop for crop, _ in ranked]
+        if spec != "all":
+            crops = crops[:int(spec)]
+    limit = limit if limit is not None else registry.max_bundles
+    return crops[:limit] if limit else crops
+
+
+def warm_crop(crop):
+    """Load a crop's bundle and run one all-zeros predict through it."""
+    bundle = registry.get(crop)
+    X = bundle.assembler.transform([{}])
+    bundle.model.predict(bundle.assembler.model_input(bundle.model, X))
+    return crop
+
+
+def load_master_table():
+    load_data()
+    from src.app.services.analysis_cubes import get_cubes
+
+    get_cubes()
+
+
+async def warm_up(crops):
+    """
+    Warm the master table and its analysis cubes, the default model and
+    `crops` (from crops_to_preload()), retrying what failed.
+    """
+    start = time.perf_counter()
+    readiness.status = "warming"
+    readiness.crops_total = len(crops)
+
+    # The API can't answer anything useful without the master table: retry until it loads
+    while True:
+        try:
+            await asyncio.to_thread(load_master_table)
+            readiness.errors.pop("master_table", None)
+            break
+        except Exception as exc:
+            readiness.errors["master_table"] = str(exc)
+            readiness.status = "degraded"
+            print(f"⚠️ Master table failed to load ({exc}), retrying in {WARMUP_RETRY_SECONDS:g}s")
+            await asyncio.sleep(WARMUP_RETRY_SECONDS)
+    readiness.status = "warming"
+
+    try:
+        await asyncio.to_thread(get_default_model)
+    except Exception as exc:
+        readiness.errors["default_model"] = str(exc)
+
+    # One job per worker at a time: warm-up must not fill the queue ahead of real traffic
+    gate = asyncio.Semaphore(pool.workers)
+
+    async def warm(crop):
+        async with gate:
+            try:
+                await pool.run(warm_crop, crop)
+                readiness.crops_loaded += 1
+                readiness.errors.pop(crop, None)
+            except Exception as exc:
+                readiness.errors[crop] = str(exc)
+
+    await asyncio.gather(*(warm(crop) for crop in crops))
+    readiness.seconds = round(time.perf_counter() - start, 3)
+    readiness.status = "ready"
+    print(f"🔥 Warm-up done: {readiness.crops_loaded}/{len(crops)} crop model(s) in {readiness.seconds:.1f}s")
+
+    for _ in range(WARMUP_CROP_RETRIES):
+        failed = [crop for crop in crops if crop in readiness.errors]
+        if not failed:
+            break
+        print(f"⚠️ Warm-up failed for: {', '.join(failed)} — retrying in {WARMUP_RETRY_SECONDS:g}s")
+        await asyncio.sleep(WARMUP_RETRY_SECONDS)
+        await asyncio.gather(*(warm(crop) for crop in failed))
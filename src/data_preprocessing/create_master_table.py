@@ -1,5 +1,13 @@
 import pandas as pd
 import os
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/create_master_table.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.imputation import impute_grouped
+from src.data_preprocessing.partitions import OUT_OF_CORE, iter_partitions
+from src.data_preprocessing.storage import read_table, write_table
 
 FINAL_PATH = "data/final/"
 OUTPUT_PATH = "data/final/"
@@ -29,30 +37,11 @@ def fill_missing_values(df):
     Fill missing values for crops, fertilizers, rainfall, and pesticides
     using state mean → national mean fallback.
     """
-    for col in df.columns:
-        if col in ["State", "Year", "Crop"]:
-            continue
-
-        # Work state by state
-        for state, sub in df.groupby("State"):
-            state_vals = sub[col].dropna()
-            if len(state_vals) > 0:
-                state_mean = state_vals.mean()
-                mask = (df["State"] == state) & (df[col].isna())
-                df.loc[mask, col] = state_mean
-
-        # If still NA, fill with national mean
-        if df[col].isna().sum() > 0:
-            national_mean = df[col].mean()
-            df[col] = df[col].fillna(national_mean)
+    value_cols = [col for col in df.columns if col not in ["State", "Year", "Crop"]]
+    return impute_grouped(df, value_cols, group_col="State")
 
-    return df
-
-
-def create_master_table():
-    # ---------- Load merged dataset ----------
-    master = pd.read_csv(FINAL_PATH + "master_dataset.csv")
 
+def aggregate_duplicates(master):
     # ---------- Drop unwanted columns ----------
     drop_cols = [
         # Per-crop yield wide columns
@@ -71,7 +60,18 @@ def create_master_table():
 
     # ---------- Aggregate duplicates ----------
     agg_dict = {col: "mean" for col in master.columns if col not in ["State", "Year", "Crop"]}
-    master = master.groupby(["State", "Year", "Crop"], as_index=False).agg(agg_dict)
+    return master.groupby(["State", "Year", "Crop"], as_index=False, observed=True).agg(agg_dict)
+
+
+def create_master_table(out_of_core=None):
+    # ---------- Load merged dataset ----------
+    if OUT_OF_CORE if out_of_core is None else out_of_core:
+        # State partitions one at a time: aggregation is per (State, Year, Crop),
+        # so only the (much smaller) aggregated rows are ever held together
+        parts = iter_partitions(FINAL_PATH + "master_dataset.csv")
+        master = pd.concat([aggregate_duplicates(part) for _, part in parts], ignore_index=True)
+    else:
+        master = aggregate_duplicates(read_table(FINAL_PATH + "master_dataset.csv"))
 
     # ---------- Fix scientific notation crops ----------
     master = clean_scientific_notation(master)
@@ -80,7 +80,7 @@ def create_master_table():
     master = fill_missing_values(master)
 
     # ---------- Save final master ----------
-    master.to_csv(OUTPUT_PATH + "master_table.csv", index=False)
+    write_table(master, OUTPUT_PATH + "master_table.csv")
     print(f"🎉 Final master table saved at {OUTPUT_PATH}master_table.csv")
     print(f"✅ Shape: {master.shape}")
     print(f"✅ Columns: {list(master.columns)}")
@@ -1,5 +1,11 @@
-import pandas as pd
 import os
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/handle_missing.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.imputation import impute_grouped
+from src.data_preprocessing.storage import read_table, write_table
 
 # Paths
 PROC_PATH = "data/processed/"
@@ -22,14 +28,11 @@ def fill_na_with_mean(df, value_cols, group_col="State"):
     """
     Fill remaining missing values with state mean or national mean
     """
-    for col in value_cols:
-        df[col] = df.groupby(group_col)[col].transform(lambda x: x.fillna(x.mean()))
-        df[col] = df[col].fillna(df[col].mean())
-    return df
+    return impute_grouped(df, value_cols, group_col=group_col)
 
 # ---------- 1. Crop Yield ----------
 def clean_crop_yield():
-    df = pd.read_csv(PROC_PATH + "std_crop_yield.csv")
+    df = read_table(PROC_PATH + "std_crop_yield.csv")
 
     value_cols = ["Yield", "Rainfall", "Fertilizer_N", "Pesticides"]
 
@@ -39,12 +42,12 @@ def clean_crop_yield():
     # fill remaining NAs
     df = fill_na_with_mean(df, value_cols)
 
-    df.to_csv(CLEAN_PATH + "crop_yield_clean.csv", index=False)
+    write_table(df, CLEAN_PATH + "crop_yield_clean.csv")
     print("✅ Crop yield missing values handled")
 
 # ---------- 2. District Crop ----------
 def clean_district_crop():
-    df = pd.read_csv(PROC_PATH + "std_district_crop.csv")
+    df = read_table(PROC_PATH + "std_district_crop.csv")
 
     # All crop columns
     crop_cols = [c for c in df.columns if "_Yield" in c]
@@ -55,41 +58,41 @@ def clean_district_crop():
     # fill remaining
     df = fill_na_with_mean(df, crop_cols)
 
-    df.to_csv(CLEAN_PATH + "district_crop_clean.csv", index=False)
+    write_table(df, CLEAN_PATH + "district_crop_clean.csv")
     print("✅ District crop missing values handled")
 
 # ---------- 3. Fertilizer ----------
 def clean_fertilizer():
-    df = pd.read_csv(PROC_PATH + "std_fertilizers.csv")
+    df = read_table(PROC_PATH + "std_fertilizers.csv")
     # Correct column names
     value_cols = ["Fertilizer_N", "Fertilizer_P", "Fertilizer_K", "Fertilizer_Total"]
 
     df = interpolate_state(df, value_cols)
     df = fill_na_with_mean(df, value_cols)
 
-    df.to_csv(CLEAN_PATH + "fertilizer_clean.csv", index=False)
+    write_table(df, CLEAN_PATH + "fertilizer_clean.csv")
     print("✅ Fertilizer missing values handled")
 
 # ---------- 4. Pesticides ----------
 def clean_pesticides():
-    df = pd.read_csv(PROC_PATH + "std_pesticides.csv")
+    df = read_table(PROC_PATH + "std_pesticides.csv")
     value_cols = ["Pesticides"]
 
     df = interpolate_state(df, value_cols)
     df = fill_na_with_mean(df, value_cols)
 
-    df.to_csv(CLEAN_PATH + "pesticides_clean.csv", index=False)
+    write_table(df, CLEAN_PATH + "pesticides_clean.csv")
     print("✅ Pesticides missing values handled")
 
 # ---------- 5. Rainfall ----------
 def clean_rainfall():
-    df = pd.read_csv(PROC_PATH + "std_rainfall.csv")
+    df = read_table(PROC_PATH + "std_rainfall.csv")
     value_cols = ["Rainfall"]
 
     df = interpolate_state(df, value_cols)
     df = fill_na_with_mean(df, value_cols)
 
-    df.to_csv(CLEAN_PATH + "rainfall_clean.csv", index=False)
+    write_table(df, CLEAN_PATH + "rainfall_clean.csv")
     print("✅ Rainfall missing values handled")
 
 # ---------- Run all ----------
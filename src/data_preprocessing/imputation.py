@@ -0,0 +1,107 @@
+import pandas as pd
+
+
+def impute_grouped(df, value_cols, group_col="State", missing_value=None):
+    """
+    Replace missing entries in all `value_cols` at once with their group mean,
+    falling back to the column's overall mean.
+
+    An entry is "missing" when it is NaN, or — if `missing_value` is given —
+    when it equals that value (e.g. 0 for false zeros; NaNs are then left
+    untouched). Group means ignore missing entries. A group with no valid
+    values is left for the fallback, whose mean is taken over the column
+    after group filling. One groupby().transform covers every column, so the
+    cost is linear in rows × columns.
+    """
+    value_cols = [c for c in value_cols if c in df.columns]
+    if not value_cols:
+        return df
+
+    block = df[value_cols]
+    is_missing = _missing_mask(block, missing_value)
+
+    group_means = block.mask(is_missing).groupby(df[group_col], observed=True).transform("mean")
+    filled = block.mask(is_missing & group_means.notna(), group_means)
+
+    # Fallback: overall mean of what is valid after group filling
+    still_missing = _missing_mask(filled, missing_value)
+    overall_means = filled.mask(still_missing).mean()
+    filled = filled.mask(still_missing, overall_means, axis=1)
+
+    df[value_cols] = filled
+    return df
+
+
+class StreamingGroupedImputer:
+    """
+    impute_grouped() for a table processed in chunks: call update() with every
+    chunk, then transform() each chunk. Fills match impute_grouped() on the
+    whole table (up to float summation order); the state held is one row of
+    sums per group.
+    """
+
+    def __init__(self, value_cols, group_col="State", missing_value=None):
+        self.value_cols = list(value_cols)
+        self.group_col = group_col
+        self.missing_value = missing_value
+        self._totals = None  # per group: Σ valid, n valid, n missing for every column
+        self._group_means = None
+        self._overall_means = None
+
+    def _columns(self, df):
+        return [c for c in self.value_cols if c in df.columns]
+
+    def update(self, df):
+        cols = self._columns(df)
+        if not cols:
+            return
+        block = df[cols]
+        is_missing = _missing_mask(block, self.missing_value)
+        valid = block.mask(is_missing)
+        keys = df[self.group_col].astype(object)
+
+        totals = pd.concat({
+            "sum": valid.groupby(keys, dropna=False).sum(),
+            "count": valid.groupby(keys, dropna=False).count(),
+            "missing": is_missing.groupby(keys, dropna=False).sum(),
+        }, axis=1)
+        if self._totals is not None:
+            totals = pd.concat([self._totals, totals]).groupby(level=0, dropna=False).sum()
+        self._totals = totals
+        self._group_means = None
+
+    def _finalize(self):
+        totals = self._totals
+        sums, counts, missing = totals["sum"], totals["count"], totals["missing"]
+        # Rows without a group key never get a group mean (as in groupby().transform)
+        means = (sums / counts).where((counts > 0) & totals.index.notna()[:, None])
+
+        # Fallback: mean over valid entries plus the entries group means will fill
+        fillable = missing.where(means.notna(), 0)
+        overall = (sums.sum() + (fillable * means.fillna(0)).sum()) / (counts.sum() + fillable.sum())
+        self._group_means = means
+        self._overall_means = overall
+
+    def transform(self, df):
+        cols = self._columns(df)
+        if not cols or self._totals is None:
+            return df
+        if self._group_means is None:
+            self._finalize()
+
+        block = df[cols]
+        is_missing = _missing_mask(block, self.missing_value)
+        keys = df[self.group_col].astype(object)
+        row_means = self._group_means[cols].reindex(keys).set_axis(df.index)
+        filled = block.mask(is_missing & row_means.notna(), row_means)
+
+        still_missing = _missing_mask(filled, self.missing_value)
+        filled = filled.mask(still_missing, self._overall_means[cols], axis=1)
+        df[cols] = filled
+        return df
+
+
+def _missing_mask(block, missing_value):
+    if missing_value is None:
+        return block.isna()
+    return block == missing_value
@@ -1,63 +1,39 @@
-import pandas as pd
 import os
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/merge_datasets.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.imputation import StreamingGroupedImputer, impute_grouped
+from src.data_preprocessing.partitions import (CHUNK_ROWS, OUT_OF_CORE, PartitionedWriter, partition_root,
+                                               rewrite_parts)
+from src.data_preprocessing.storage import iter_table, read_table, write_table
 
 # Paths
 CLEAN_PATH = "data/cleaned/"
 OUTPUT_PATH = "data/final/"
 os.makedirs(OUTPUT_PATH, exist_ok=True)
 
+def crop_yield_columns(df):
+    return [c for c in df.columns if "_Yield" in c]
+
+
 def fix_false_zeros(df):
     """
     Replace false zeros in crop yield columns:
     If a state has any non-zero values for a crop, then
     replace zeros with state mean (ignoring zeros), else fallback to national mean.
     """
-    crop_cols = [c for c in df.columns if "_Yield" in c]
-
-    for col in crop_cols:
-        # Work state by state
-        for state, sub in df.groupby("State"):
-            state_vals = sub[col].replace(0, pd.NA)  # ignore zeros
-            if state_vals.notna().sum() > 0:  # at least one valid value
-                state_mean = state_vals.mean()
-
-                # Replace only the zeros for that state
-                mask = (df["State"] == state) & (df[col] == 0)
-                df.loc[mask, col] = state_mean
-
-        # If still zeros left (all years were zero for state),
-        # fill with national mean ignoring zeros
-        national_mean = df.loc[df[col] != 0, col].mean()
-        df[col] = df[col].replace(0, national_mean)
-
-    return df
-
-
-def merge_datasets():
-    # ---------- Load datasets ----------
-    crop_yield = pd.read_csv(CLEAN_PATH + "crop_yield_clean.csv")
-    district_crop = pd.read_csv(CLEAN_PATH + "district_crop_clean.csv")
-    fertilizer = pd.read_csv(CLEAN_PATH + "fertilizer_clean.csv")
-    pesticides = pd.read_csv(CLEAN_PATH + "pesticides_clean.csv")
-    rainfall = pd.read_csv(CLEAN_PATH + "rainfall_clean.csv")
-
-    # ---------- Preprocess District Crop ----------
-    # Remove district column & aggregate by state-year
-    if "District" in district_crop.columns:
-        district_crop = district_crop.drop(columns=["District"])
-
-    district_grouped = district_crop.groupby(["State", "Year"]).mean(numeric_only=True).reset_index()
+    return impute_grouped(df, crop_yield_columns(df), group_col="State", missing_value=0)
 
-    # ---------- Preprocess Fertilizers ----------
-    # Keep only Fertilizer_Total
-    fertilizer = fertilizer[["State", "Year", "Fertilizer_Total"]]
 
-    # ---------- Preprocess Pesticides ----------
+def country_pesticides(pesticides):
     # National level → spread to all states
     pesticides_country = pesticides.groupby("Year")["Pesticides"].sum().reset_index()
-    pesticides_country.rename(columns={"Pesticides": "Pesticides_total_country"}, inplace=True)
+    return pesticides_country.rename(columns={"Pesticides": "Pesticides_total_country"})
 
-    # ---------- Merge ----------
+
+def merge_dimensions(crop_yield, district_grouped, fertilizer, rainfall, pesticides_country):
     # Start with crop_yield (has State, Year, Crop)
     master = crop_yield.copy()
 
@@ -72,16 +48,98 @@ def merge_datasets():
 
     # Merge pesticides (national → match by year)
     master = master.merge(pesticides_country, on="Year", how="left")
+    return master
+
+
+def merge_datasets(out_of_core=None):
+    if OUT_OF_CORE if out_of_core is None else out_of_core:
+        return merge_datasets_out_of_core()
+
+    # ---------- Load datasets ----------
+    crop_yield = read_table(CLEAN_PATH + "crop_yield_clean.csv")
+    district_crop = read_table(CLEAN_PATH + "district_crop_clean.csv")
+    fertilizer = read_table(CLEAN_PATH + "fertilizer_clean.csv")
+    pesticides = read_table(CLEAN_PATH + "pesticides_clean.csv")
+    rainfall = read_table(CLEAN_PATH + "rainfall_clean.csv")
+
+    # ---------- Preprocess District Crop ----------
+    # Remove district column & aggregate by state-year
+    if "District" in district_crop.columns:
+        district_crop = district_crop.drop(columns=["District"])
+
+    district_grouped = district_crop.groupby(["State", "Year"], observed=True).mean(numeric_only=True).reset_index()
+
+    # ---------- Preprocess Fertilizers ----------
+    # Keep only Fertilizer_Total
+    fertilizer = fertilizer[["State", "Year", "Fertilizer_Total"]]
+
+    # ---------- Merge ----------
+    master = merge_dimensions(crop_yield, district_grouped, fertilizer, rainfall, country_pesticides(pesticides))
 
     # ---------- Handle False Zeros in Crop Yields ----------
     master = fix_false_zeros(master)
 
     # ---------- Save ----------
-    master.to_csv(OUTPUT_PATH + "master_dataset.csv", index=False)
+    write_table(master, OUTPUT_PATH + "master_dataset.csv")
     print(f"🎉 Master dataset saved at {OUTPUT_PATH}master_dataset.csv")
     print(f"✅ Final shape: {master.shape}")
     print(f"✅ Columns: {list(master.columns)}")
 
 
+# ---------- Out-of-core mode ----------
+def district_state_means(chunks):
+    """District table → per state-year means, accumulated as sums/counts one chunk at a time."""
+    sums, counts = None, None
+    for chunk in chunks:
+        if "District" in chunk.columns:
+            chunk = chunk.drop(columns=["District"])
+        chunk = chunk.astype({"State": object})  # chunks carry different category sets
+        grouped = chunk.groupby(["State", "Year"])
+        chunk_sums = grouped.sum(numeric_only=True)
+        chunk_counts = grouped.count()[chunk_sums.columns]
+        sums = chunk_sums if sums is None else sums.add(chunk_sums, fill_value=0)
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    return (sums / counts.where(counts > 0)).reset_index()
+
+
+def merge_datasets_out_of_core(chunk_rows=None):
+    """
+    merge_datasets() with bounded memory: crop_yield is streamed in chunks of
+    `chunk_rows` rows, the district table is reduced to state-year means
+    chunk by chunk, and only the small dimension tables (state-year
+    fertilizer, rainfall, national pesticides) are held in memory. Output is
+    partitioned by State (see partitions.py); false zeros are fixed in a
+    second pass over the parts once state and national means are known.
+    """
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    out_path = OUTPUT_PATH + "master_dataset.csv"
+
+    # ---------- Dimension tables ----------
+    district_grouped = district_state_means(iter_table(CLEAN_PATH + "district_crop_clean.csv", chunk_rows))
+    fertilizer = read_table(CLEAN_PATH + "fertilizer_clean.csv", columns=["State", "Year", "Fertilizer_Total"])
+    rainfall = read_table(CLEAN_PATH + "rainfall_clean.csv")
+    pesticides_country = country_pesticides(read_table(CLEAN_PATH + "pesticides_clean.csv"))
+
+    # ---------- Merge chunk by chunk ----------
+    writer = PartitionedWriter(out_path, key="State")
+    imputer = None
+    for chunk in iter_table(CLEAN_PATH + "crop_yield_clean.csv", chunk_rows):
+        merged = merge_dimensions(chunk, district_grouped, fertilizer, rainfall, pesticides_country)
+        if imputer is None:
+            imputer = StreamingGroupedImputer(crop_yield_columns(merged), group_col="State", missing_value=0)
+        imputer.update(merged)
+        writer.write(merged)
+    index = writer.close()
+
+    # ---------- Handle False Zeros in Crop Yields ----------
+    if imputer is not None and imputer.value_cols:
+        index = rewrite_parts(out_path, imputer.transform)
+
+    print(f"🎉 Master dataset saved at {partition_root(out_path)} ({len(index['partitions'])} partitions)")
+    print(f"✅ Final shape: ({index['rows']}, {len(index['columns'])})")
+    print(f"✅ Columns: {index['columns']}")
+    return index
+
+
 if __name__ == "__main__":
     merge_datasets()
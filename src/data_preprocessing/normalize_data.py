@@ -1,6 +1,12 @@
 import os
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/normalize_data.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.storage import read_table, write_table
 
 # ---- Inputs (from cleaned step) ----
 INPUTS = {
@@ -96,7 +102,7 @@ def normalize_dataset(name, in_path, out_path, id_cols, extra_exclude):
         print(f"❌ File not found: {in_path}")
         return
     try:
-        df = pd.read_csv(in_path)
+        df = read_table(in_path)
     except Exception as e:
         print(f"⚠️ Error reading {in_path}: {e}")
         return
@@ -105,11 +111,12 @@ def normalize_dataset(name, in_path, out_path, id_cols, extra_exclude):
 
     # Apply state renaming only for fertilizers
     if name == "fertilizers" and "State" in df.columns:
-        df["State"] = df["State"].replace(STATE_RENAMES)
+        # astype(object): renames may introduce names not among the stored categories
+        df["State"] = df["State"].astype(object).replace(STATE_RENAMES)
         print("🔄 Standardized state names in fertilizers dataset.")
 
     df_norm = normalize_one(df, id_cols=id_cols, extra_exclude=extra_exclude)
-    df_norm.to_csv(out_path, index=False)
+    write_table(df_norm, out_path)
     print(f"✅ Saved → {out_path}")
 
 if __name__ == "__main__":
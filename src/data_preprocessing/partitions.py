@@ -0,0 +1,137 @@
+"""
+Partitioned tables for the out-of-core pipeline mode.
+
+A partitioned table keeps its historical ``.csv`` name but is stored as one
+directory per key value (``master_dataset.parts/<State>/part-00000.*``, each
+part written with storage.write_table) plus an index file
+(``master_dataset.parts.json``) listing the parts, their row counts and
+content hashes. The index is what pipeline stages declare as their
+input/output, so a change in any part invalidates downstream stages.
+
+Configure with:
+    PIPELINE_OUT_OF_CORE = 1 | 0         (default: 0)
+    PIPELINE_CHUNK_ROWS  = rows per chunk (default: 20000)
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import pandas as pd
+
+from src.data_preprocessing.storage import STORAGE_FORMAT, binary_path, read_table, write_table
+
+OUT_OF_CORE = os.getenv("PIPELINE_OUT_OF_CORE", "0") == "1"
+CHUNK_ROWS = int(os.getenv("PIPELINE_CHUNK_ROWS", "20000"))
+
+
+def index_path(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parts.json"
+
+
+def partition_root(csv_path):
+    return os.path.splitext(csv_path)[0] + ".parts"
+
+
+def _slug(value):
+    """Readable, collision-free directory name for a key value."""
+    text = "null" if pd.isna(value) else str(value)
+    digest = hashlib.sha1(text.encode()).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_')}-{digest}"
+
+
+def _stored_path(part_csv):
+    """Parts are written in the storage format only (no CSV copy unless the format is CSV)."""
+    return part_csv if STORAGE_FORMAT == "csv" else binary_path(part_csv)
+
+
+def _write_part(df, part_csv):
+    write_table(df, part_csv, write_csv=STORAGE_FORMAT == "csv")
+
+
+def _part_hash(part_csv):
+    digest = hashlib.sha256()
+    with open(_stored_path(part_csv), "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PartitionedWriter:
+    """
+    Appends chunks to a table partitioned by `key`; each chunk adds at most
+    one part file per key value, so memory stays at one chunk. close()
+    writes the index.
+    """
+
+    def __init__(self, csv_path, key="State"):
+        self.csv_path = csv_path
+        self.key = key
+        self.root = partition_root(csv_path)
+        self.partitions = {}  # slug → {"value", "parts": [paths], "rows"}
+        self.columns = None
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root)
+
+    def write(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+        for value, part in chunk.groupby(self.key, observed=True, sort=False, dropna=False):
+            slug = _slug(value)
+            entry = self.partitions.setdefault(
+                slug, {"value": None if pd.isna(value) else str(value), "parts": [], "rows": 0})
+            directory = os.path.join(self.root, slug)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{len(entry['parts']):05d}.csv")
+            _write_part(part, path)
+            entry["parts"].append(path)
+            entry["rows"] += len(part)
+
+    def close(self):
+        index = {
+            "key": self.key,
+            "columns": self.columns or [],
+            "rows": sum(p["rows"] for p in self.partitions.values()),
+            "partitions": {
+                slug: {**entry, "hashes": [_part_hash(p) for p in entry["parts"]]}
+                for slug, entry in sorted(self.partitions.items(), key=lambda item: str(item[1]["value"]))
+            },
+        }
+        _write_index(index, self.csv_path)
+        return index
+
+
+def _write_index(index, csv_path):
+    tmp = index_path(csv_path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, index_path(csv_path))
+
+
+def read_index(csv_path):
+    with open(index_path(csv_path)) as f:
+        return json.load(f)
+
+
+def iter_partitions(csv_path, columns=None):
+    """Yield (key value, DataFrame) per partition, in key order; one partition in memory at a time."""
+    for entry in read_index(csv_path)["partitions"].values():
+        parts = [read_table(p, columns=columns) for p in entry["parts"]]
+        yield entry["value"], pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+
+def rewrite_parts(csv_path, transform):
+    """Apply transform(df) → df to every part file in place, then refresh the index hashes."""
+    index = read_index(csv_path)
+    for entry in index["partitions"].values():
+        for path in entry["parts"]:
+            df = transform(read_table(path))
+            # Write beside the part and swap it in: the old file may still be memory-mapped
+            tmp = path[:-len(".csv")] + ".tmp.csv"
+            _write_part(df, tmp)
+            os.replace(_stored_path(tmp), _stored_path(path))
+        entry["hashes"] = [_part_hash(p) for p in entry["parts"]]
+
+    _write_index(index, csv_path)
+    return index
@@ -0,0 +1,265 @@
+"""
+Incremental runner for the preprocessing stages.
+
+Each stage declares the tables it reads and writes; dependencies follow from
+those paths. Before running a stage its inputs and code are fingerprinted
+(SHA-256 of file contents); if they match the last successful run recorded in
+the manifest and the outputs are still intact, the stage is skipped.
+Independent stages run in parallel in a process pool.
+
+Run from the repo root:
+    python -m src.data_preprocessing.pipeline [--jobs N] [--force] [--only STAGE ...] [--dry-run] [--out-of-core]
+"""
+import argparse
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/pipeline.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.partitions import OUT_OF_CORE, index_path
+from src.data_preprocessing.storage import resolve_path
+
+MANIFEST_PATH = "data/pipeline_manifest.json"
+
+RAW = "data/raw/"
+PROC = "data/processed/"
+CLEAN = "data/cleaned/"
+FINAL = "data/final/"
+
+# Helpers every stage depends on: a change here invalidates all stages
+SHARED_MODULES = ["src.data_preprocessing.storage", "src.data_preprocessing.imputation",
+                  "src.data_preprocessing.partitions", "src.data_preprocessing.schema"]
+
+
+class Stage:
+    def __init__(self, name, module, func, inputs, outputs, kwargs=None):
+        self.name = name
+        self.module = module
+        self.func = func
+        self.inputs = inputs
+        self.outputs = outputs
+        self.kwargs = kwargs or {}
+
+
+def _normalize_stages():
+    from src.data_preprocessing import normalize_data
+
+    return [
+        Stage(f"normalize_{key}", "src.data_preprocessing.normalize_data", "normalize_dataset",
+              inputs=[in_path], outputs=[normalize_data.OUTPUTS[key]],
+              kwargs={"name": key, "in_path": in_path, "out_path": normalize_data.OUTPUTS[key],
+                      "id_cols": normalize_data.RULES[key]["id_cols"],
+                      "extra_exclude": normalize_data.RULES[key]["extra_exclude"]})
+        for key, in_path in normalize_data.INPUTS.items()
+    ]
+
+
+def build_stages(out_of_core=None):
+    std = "src.data_preprocessing.standardize_columns"
+    clean = "src.data_preprocessing.handle_missing"
+    # Out-of-core mode writes master_dataset partitioned by State, tracked through its index file
+    out_of_core = OUT_OF_CORE if out_of_core is None else out_of_core
+    merged = index_path(FINAL + "master_dataset.csv") if out_of_core else FINAL + "master_dataset.csv"
+    mode = {"out_of_core": out_of_core}
+    return [
+        # ---------- standardize_columns ----------
+        Stage("process_crop_yield", std, "process_crop_yield",
+              [RAW + "crop_yield_1997_2020.csv"], [PROC + "std_crop_yield.csv"]),
+        Stage("process_district_crop", std, "process_district_crop",
+              [RAW + "district_crop_data.csv"], [PROC + "std_district_crop.csv"]),
+        Stage("process_pesticides", std, "process_pesticides",
+              [RAW + "faostat_pesticide_india.csv"], [PROC + "std_pesticides.csv"]),
+        Stage("process_fertilizers", std, "process_fertilizers",
+              [RAW + "fertilizer_district_1969_2017.csv"], [PROC + "std_fertilizers.csv"]),
+        Stage("process_rainfall", std, "process_rainfall",
+              [RAW + "imd_rainfall_1901_2017.csv", "data/mappings/imd_subdivision_states.csv"],
+              [PROC + "std_rainfall.csv"]),
+        # ---------- handle_missing ----------
+        Stage("clean_crop_yield", clean, "clean_crop_yield",
+              [PROC + "std_crop_yield.csv"], [CLEAN + "crop_yield_clean.csv"]),
+        Stage("clean_district_crop", clean, "clean_district_crop",
+              [PROC + "std_district_crop.csv"], [CLEAN + "district_crop_clean.csv"]),
+        Stage("clean_fertilizer", clean, "clean_fertilizer",
+              [PROC + "std_fertilizers.csv"], [CLEAN + "fertilizer_clean.csv"]),
+        Stage("clean_pesticides", clean, "clean_pesticides",
+              [PROC + "std_pesticides.csv"], [CLEAN + "pesticides_clean.csv"]),
+        Stage("clean_rainfall", clean, "clean_rainfall",
+              [PROC + "std_rainfall.csv"], [CLEAN + "rainfall_clean.csv"]),
+        # ---------- normalize_data (side branch) ----------
+        *_normalize_stages(),
+        # ---------- merge + master ----------
+        Stage("merge_datasets", "src.data_preprocessing.merge_datasets", "merge_datasets",
+              [CLEAN + f for f in ["crop_yield_clean.csv", "district_crop_clean.csv", "fertilizer_clean.csv",
+                                   "pesticides_clean.csv", "rainfall_clean.csv"]],
+              [merged], kwargs=mode),
+        Stage("create_master_table", "src.data_preprocessing.create_master_table", "create_master_table",
+              [merged], [FINAL + "master_table.csv"], kwargs=mode),
+    ]
+
+
+# ---------- Fingerprints ----------
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def table_hash(csv_path):
+    """Hash of the file read_table() would actually read for `csv_path` (None if missing)."""
+    path = resolve_path(csv_path)
+    return file_hash(path) if os.path.exists(path) else None
+
+
+def code_hash(stage):
+    digest = hashlib.sha256()
+    for module_name in [stage.module] + SHARED_MODULES:
+        digest.update(file_hash(inspect.getsourcefile(importlib.import_module(module_name))).encode())
+    digest.update(json.dumps(stage.kwargs, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def fingerprint(stage):
+    return {
+        "code": code_hash(stage),
+        "inputs": {p: table_hash(p) for p in stage.inputs},
+    }
+
+
+def is_up_to_date(stage, fp, manifest):
+    record = manifest.get(stage.name)
+    if record is None or record.get("code") != fp["code"] or record.get("inputs") != fp["inputs"]:
+        return False
+    # Outputs must still be what this stage produced last time
+    return all(record.get("outputs", {}).get(p) == table_hash(p) for p in stage.outputs)
+
+
+# ---------- Execution ----------
+def _run_stage(module_name, func_name, kwargs):
+    """Process-pool entry point: import the stage module and call its function."""
+    start = time.perf_counter()
+    getattr(importlib.import_module(module_name), func_name)(**kwargs)
+    return time.perf_counter() - start
+
+
+def dependencies(stages):
+    producers = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producers[i] for i in s.inputs if i in producers and producers[i] != s.name} for s in stages}
+
+
+def select(stages, only):
+    """Restrict to `only` stages plus everything they depend on."""
+    if not only:
+        return stages
+    deps = dependencies(stages)
+    unknown = set(only) - set(deps)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {sorted(unknown)}")
+    wanted, todo = set(), list(only)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(deps[name])
+    return [s for s in stages if s.name in wanted]
+
+
+def run_pipeline(stages=None, jobs=None, force=False, dry_run=False, manifest_path=MANIFEST_PATH):
+    """Run stages in dependency order; returns {stage: "ran" | "skipped" | "kept"}."""
+    stages = stages or build_stages()
+    by_name = {s.name: s for s in stages}
+    deps = dependencies(stages)
+    manifest = load_manifest(manifest_path)
+    status, fingerprints = {}, {}
+    pending = set(by_name)
+
+    def ready():
+        return sorted(n for n in pending if deps[n] <= set(status))
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for name in ready():
+                pending.discard(name)
+                stage = by_name[name]
+                fp = fingerprint(stage)
+
+                if any(h is None for h in fp["inputs"].values()):
+                    missing = [p for p, h in fp["inputs"].items() if h is None]
+                    if all(table_hash(p) is not None for p in stage.outputs):
+                        print(f"⚠️ {name}: inputs missing {missing}, keeping existing outputs")
+                        status[name] = "kept"
+                        continue
+                    raise FileNotFoundError(f"{name}: missing inputs {missing}")
+
+                upstream_changed = dry_run and any(status[d] == "ran" for d in deps[name])
+                if not force and not upstream_changed and is_up_to_date(stage, fp, manifest):
+                    print(f"⏭️ {name}: up to date")
+                    status[name] = "skipped"
+                    continue
+
+                if dry_run:
+                    print(f"📝 {name}: would run")
+                    status[name] = "ran"
+                    continue
+
+                fingerprints[name] = fp
+                running[pool.submit(_run_stage, stage.module, stage.func, stage.kwargs)] = name
+
+            if not running:
+                if pending and not ready():
+                    raise RuntimeError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                elapsed = future.result()
+                manifest[name] = {
+                    **fingerprints[name],
+                    "outputs": {p: table_hash(p) for p in by_name[name].outputs},
+                    "seconds": round(elapsed, 3),
+                }
+                save_manifest(manifest, manifest_path)
+                status[name] = "ran"
+                print(f"✅ {name}: done in {elapsed:.2f}s")
+
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the preprocessing pipeline incrementally.")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rerun every selected stage")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="run these stages and their dependencies")
+    parser.add_argument("--dry-run", action="store_true", help="report what would run")
+    parser.add_argument("--out-of-core", action="store_true", default=None,
+                        help="merge in chunks into State partitions (default: PIPELINE_OUT_OF_CORE)")
+    args = parser.parse_args()
+
+    status = run_pipeline(select(build_stages(args.out_of_core), args.only), jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    ran = sum(1 for s in status.values() if s == "ran")
+    print(f"\n🎉 Pipeline finished: {ran} stage(s) run, {len(status) - ran} skipped")
@@ -0,0 +1,118 @@
+"""
+Column dtypes for every table the pipeline writes, applied by
+storage.read_table / iter_table so each stage, the trainers and the API see
+the same compact types whatever format the table was read from:
+
+    State / Crop / District / Subdivision → category
+    Year                                  → int16 (left as-is if it has gaps)
+    measures (yield, rainfall, inputs)    → float32, only on request
+
+Key casts are lossless and apply to every read. Measures stay float64 unless
+the reader asks for float32 (the trainers: trees split on float32 anyway),
+because the preprocessing stages write what they read back to disk and the
+API serves the stored values.
+
+Tables are identified by their file stem (partition parts by their table's
+stem); files not listed here, e.g. the raw downloads, keep pandas' defaults.
+"""
+import os
+import re
+
+import pandas as pd
+
+CATEGORY = "category"
+YEAR = "int16"
+MEASURE = "float32"
+
+KEY_DTYPES = {
+    "State": CATEGORY,
+    "Crop": CATEGORY,
+    "District": CATEGORY,
+    "Subdivision": CATEGORY,
+    "Year": YEAR,
+}
+
+# One wide column per crop in the ICRISAT district table (RICE_YIELD_Kg_per_ha, ...)
+DISTRICT_YIELDS = re.compile(r"_YIELD_Kg_per_ha$")
+
+_CROP_YIELD = ["Yield", "Rainfall", "Fertilizer_N", "Pesticides"]
+_FERTILIZER = ["Fertilizer_N", "Fertilizer_P", "Fertilizer_K", "Fertilizer_Total"]
+_MERGED = ["Yield", "Rainfall_x", "Fertilizer_N", "Pesticides", DISTRICT_YIELDS,
+           "Fertilizer_Total", "Rainfall_y", "Pesticides_total_country"]
+_MASTER = ["Yield", "Rainfall_x", "Pesticides", "Fertilizer_Total", "Rainfall_y", "Pesticides_total_country"]
+
+# Table stem → measure columns (names or patterns) read as float32 on request
+DATASETS = {
+    # data/processed (standardize_columns)
+    "std_crop_yield": _CROP_YIELD,
+    "std_district_crop": [DISTRICT_YIELDS],
+    "std_fertilizers": _FERTILIZER,
+    "std_pesticides": ["Pesticides"],
+    "std_rainfall": ["Rainfall"],
+    # data/cleaned (handle_missing)
+    "crop_yield_clean": _CROP_YIELD,
+    "district_crop_clean": [DISTRICT_YIELDS],
+    "fertilizer_clean": _FERTILIZER,
+    "pesticides_clean": ["Pesticides"],
+    "rainfall_clean": ["Rainfall"],
+    # data/processed (normalize_data)
+    "norm_crop_yield": _CROP_YIELD,
+    "norm_district_crop": [DISTRICT_YIELDS],
+    "norm_fertilizer": _FERTILIZER,
+    "norm_pesticides": ["Pesticides"],
+    "norm_rainfall": ["Rainfall"],
+    # data/final
+    "master_dataset": _MERGED,
+    "master_table": _MASTER,
+}
+
+
+def dataset_name(csv_path):
+    """Table stem for `csv_path`; parts of a partitioned table resolve to the table."""
+    parts = os.path.normpath(csv_path).split(os.sep)
+    for directory in reversed(parts[:-1]):
+        if directory.endswith(".parts"):
+            return directory[:-len(".parts")]
+    return os.path.splitext(parts[-1])[0]
+
+
+def _is_measure(col, measures):
+    return any(col == m if isinstance(m, str) else m.search(col) for m in measures)
+
+
+def column_dtypes(columns, csv_path):
+    """{column: target dtype} for the columns of `csv_path` covered by the schema."""
+    measures = DATASETS.get(dataset_name(csv_path))
+    if measures is None:
+        return {}
+    dtypes = {}
+    for col in columns:
+        if col in KEY_DTYPES:
+            dtypes[col] = KEY_DTYPES[col]
+        elif _is_measure(col, measures):
+            dtypes[col] = MEASURE
+    return dtypes
+
+
+def apply_schema(df, csv_path, float32_measures=False):
+    """
+    Cast `df` to the declared dtypes of table `csv_path` (no copy if already
+    typed); measure columns only with float32_measures=True.
+    """
+    conversions = {}
+    for col, dtype in column_dtypes(df.columns, csv_path).items():
+        if dtype == MEASURE and not float32_measures:
+            continue
+        current = df[col].dtype
+        if dtype == CATEGORY:
+            if not isinstance(current, pd.CategoricalDtype):
+                conversions[col] = dtype
+        elif current == dtype or not pd.api.types.is_numeric_dtype(current):
+            continue  # already typed, or text that a later stage still has to parse
+        elif dtype == YEAR:
+            if not df[col].isna().any():
+                conversions[col] = dtype
+        else:
+            conversions[col] = dtype
+    return df.astype(conversions) if conversions else df
+
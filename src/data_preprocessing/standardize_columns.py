@@ -1,9 +1,16 @@
 import pandas as pd
 import os
+import sys
+
+if not __package__:  # run as `python src/data_preprocessing/standardize_columns.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.data_preprocessing.storage import write_table
 
 # Input & output folders
 RAW_PATH = "data/raw/"
 PROC_PATH = "data/processed/"
+SUBDIVISION_MAP_PATH = "data/mappings/imd_subdivision_states.csv"  # IMD subdivision → state(s)
 os.makedirs(PROC_PATH, exist_ok=True)
 
 # ---------- Helper function ----------
@@ -38,7 +45,7 @@ def process_crop_yield():
     df = df[["State", "Year", "Crop", "Yield", "Rainfall", "Fertilizer_N", "Pesticides"]]
     df["State"] = df["State"].apply(clean_state_name)
 
-    df.to_csv(PROC_PATH + "std_crop_yield.csv", index=False)
+    write_table(df, PROC_PATH + "std_crop_yield.csv")
     print("✅ Crop yield standardized")
 
 # ---------- 2. District Crop Data ----------
@@ -56,7 +63,7 @@ def process_district_crop():
     df = df[keep_cols]
 
     df["State"] = df["State"].apply(clean_state_name)
-    df.to_csv(PROC_PATH + "std_district_crop.csv", index=False)
+    write_table(df, PROC_PATH + "std_district_crop.csv")
     print("✅ District crop standardized (all crops kept)")
 
 # ---------- 3. FAOSTAT Pesticides ----------
@@ -70,7 +77,7 @@ def process_pesticides():
     df["State"] = "India"
 
     df = df[["State", "Year", "Pesticides"]]
-    df.to_csv(PROC_PATH + "std_pesticides.csv", index=False)
+    write_table(df, PROC_PATH + "std_pesticides.csv")
     print("✅ Pesticides standardized (Agricultural Use only)")
 
 # ---------- 4. Fertilizer District ----------
@@ -89,71 +96,51 @@ def process_fertilizers():
     df = df[["State", "Year", "Fertilizer_N", "Fertilizer_P", "Fertilizer_K", "Fertilizer_Total"]]
     df["State"] = df["State"].apply(clean_state_name)
 
-    df.to_csv(PROC_PATH + "std_fertilizers.csv", index=False)
+    write_table(df, PROC_PATH + "std_fertilizers.csv")
     print("✅ Fertilizers standardized (with total consumption)")
 
 # ---------- 5. Rainfall Data ----------
-def process_rainfall():
-    df = pd.read_csv(RAW_PATH + "imd_rainfall_1901_2017.csv")
+def load_subdivision_map(path=SUBDIVISION_MAP_PATH):
+    """Subdivision → State pairs; a subdivision listed several times is split across states."""
+    return pd.read_csv(path)[["Subdivision", "State"]].dropna()
 
-    df = df.rename(columns={"SUBDIVISION": "Subdivision", "YEAR": "Year", "ANNUAL": "Rainfall"})
-    df = df[["Subdivision", "Year", "Rainfall"]]
 
-    # Subdivision mapping → list of states (splitting & renaming)
-    SUBDIVISION_MAP = {
-        # Splits
-        "Assam & Meghalaya": ["Assam", "Meghalaya"],
-        "Naga Mani Mizo Tripura": ["Nagaland", "Manipur", "Mizoram", "Tripura"],
-        "Haryana Delhi & Chandigarh": ["Haryana", "Delhi", "Chandigarh"],
-
-        # Renames
-        "Orissa": ["Odisha"],
-        "Uttaranchal": ["Uttarakhand"],
-        "East Uttar Pradesh": ["Uttar Pradesh"],
-        "West Uttar Pradesh": ["Uttar Pradesh"],
-        "Sub Himalayan West Bengal": ["West Bengal"],
-        "Gangetic West Bengal": ["West Bengal"],
-        "West Rajasthan": ["Rajasthan"],
-        "East Rajasthan": ["Rajasthan"],
-        "West Madhya Pradesh": ["Madhya Pradesh"],
-        "East Madhya Pradesh": ["Madhya Pradesh"],
-        "Gujarat Region": ["Gujarat"],
-        "Saurashtra & Kutch": ["Gujarat"],
-        "Konkan & Goa": ["Goa"],
-        "Madhya Maharashtra": ["Maharashtra"],
-        "Marathwada": ["Maharashtra"],
-        "Vidarbha": ["Maharashtra"],
-        "Coastal Andhra Pradesh": ["Andhra Pradesh"],
-        "Rayalseema": ["Andhra Pradesh"],
-        "Coastal Karnataka": ["Karnataka"],
-        "North Interior Karnataka": ["Karnataka"],
-        "South Interior Karnataka": ["Karnataka"],
-    }
-
-    expanded_rows = []
-    for _, row in df.iterrows():
-        subdivision = row["Subdivision"]
-        states = SUBDIVISION_MAP.get(subdivision, [subdivision])  # fallback keep original name
-
-        for state in states:
-            expanded_rows.append({
-                "State": state,
-                "Year": row["Year"],
-                "Rainfall": row["Rainfall"]
-            })
-
-    new_df = pd.DataFrame(expanded_rows)
-
-    # Clean state names
-    new_df["State"] = new_df["State"].apply(clean_state_name)
+def expand_subdivisions(df, mapping):
+    """
+    Map IMD subdivisions to states by joining against `mapping` (one output row
+    per mapped state; unmapped subdivisions keep their own name), then average
+    subdivisions that land on the same state and year.
+
+    Only the distinct subdivision names are looked up and cleaned, so the cost
+    on large (monthly / district-level) series is a single integer-keyed join.
+    """
+    codes, subdivisions = pd.factorize(df["Subdivision"])
+
+    lookup = pd.DataFrame({"code": range(len(subdivisions)), "Subdivision": subdivisions})
+    lookup = lookup.merge(mapping, on="Subdivision", how="left")
+    lookup["State"] = lookup["State"].fillna(lookup["Subdivision"]).map(clean_state_name).astype("category")
+
+    rows = pd.DataFrame({"code": codes, "Year": df["Year"].to_numpy(), "Rainfall": df["Rainfall"].to_numpy()})
+    expanded = rows.merge(lookup[["code", "State"]], on="code", how="inner")
 
     # Merge duplicated states (like Maharashtra, Gujarat, Andhra Pradesh, Karnataka, etc.)
     merged_df = (
-        new_df.groupby(["State", "Year"], as_index=False)
+        expanded.groupby(["State", "Year"], as_index=False, observed=True)
         .agg({"Rainfall": "mean"})  # take average if multiple subdivisions mapped to same state
     )
+    merged_df["State"] = merged_df["State"].astype(object)
+    return merged_df
+
+
+def process_rainfall():
+    df = pd.read_csv(RAW_PATH + "imd_rainfall_1901_2017.csv")
+
+    df = df.rename(columns={"SUBDIVISION": "Subdivision", "YEAR": "Year", "ANNUAL": "Rainfall"})
+    df = df[["Subdivision", "Year", "Rainfall"]]
+
+    merged_df = expand_subdivisions(df, load_subdivision_map())
 
-    merged_df.to_csv(PROC_PATH + "std_rainfall.csv", index=False)
+    write_table(merged_df, PROC_PATH + "std_rainfall.csv")
     print("✅ Rainfall standardized with state renaming/splitting/merging")
 
 
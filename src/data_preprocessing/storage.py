@@ -0,0 +1,127 @@
+"""
+Table storage shared by every pipeline stage, the trainers and the API.
+
+Stages still address tables by their historical ``.csv`` path; the binary
+copy lives next to it with the same stem (``master_table.feather`` /
+``master_table.parquet``). Binary copies keep dtypes (State/Crop are stored
+as categoricals) and are read back memory-mapped. The CSV is kept alongside
+by default so the existing files and notebooks keep working. Tables declared
+in schema.py are cast to their dtypes on read; writes store the frame as is.
+
+Configure with:
+    PIPELINE_STORAGE_FORMAT = feather | parquet | csv   (default: feather)
+    PIPELINE_WRITE_CSV      = 1 | 0                    (default: 1)
+"""
+import os
+
+import pandas as pd
+
+from src.data_preprocessing.schema import apply_schema
+
+STORAGE_FORMAT = os.getenv("PIPELINE_STORAGE_FORMAT", "feather")
+WRITE_CSV = os.getenv("PIPELINE_WRITE_CSV", "1") == "1"
+
+BINARY_FORMATS = {"feather": ".feather", "parquet": ".parquet"}
+
+# Low-cardinality string columns stored as dictionary/categorical
+CATEGORICAL_COLS = ["State", "Crop", "District", "Subdivision"]
+
+
+def binary_path(csv_path, fmt=None):
+    fmt = fmt or STORAGE_FORMAT
+    return os.path.splitext(csv_path)[0] + BINARY_FORMATS[fmt]
+
+
+def resolve_path(csv_path, fmt=None):
+    """
+    Path read_table() will read for `csv_path`: the binary copy when it exists
+    and is at least as new as the CSV, otherwise the CSV itself.
+    """
+    fmt = fmt or STORAGE_FORMAT
+    if fmt == "csv":
+        return csv_path
+
+    bin_path = binary_path(csv_path, fmt)
+    if not os.path.exists(bin_path):
+        return csv_path
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(bin_path):
+        return csv_path  # CSV edited after the binary copy was written
+    return bin_path
+
+
+def to_categoricals(df):
+    for col in CATEGORICAL_COLS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_table(df, csv_path, fmt=None, write_csv=None):
+    """Write `df` in the configured binary format (and CSV unless disabled)."""
+    fmt = fmt or STORAGE_FORMAT
+    write_csv = WRITE_CSV if write_csv is None else write_csv
+
+    if fmt == "csv" or write_csv:
+        df.to_csv(csv_path, index=False)
+    if fmt == "csv":
+        return
+
+    typed = to_categoricals(df.reset_index(drop=True).copy())
+    bin_path = binary_path(csv_path, fmt)
+    if fmt == "feather":
+        # Uncompressed so the file can be memory-mapped without decoding
+        typed.to_feather(bin_path, compression="uncompressed")
+    else:
+        typed.to_parquet(bin_path, index=False)
+
+
+def read_table(csv_path, fmt=None, columns=None, schema=True, float32_measures=False):
+    """
+    Read a table written by write_table(), preferring the binary copy, with
+    the schema.py dtypes applied (schema=False: as stored/parsed). Measures
+    are float32 only with float32_measures=True: never for a frame that
+    will be written back.
+    """
+    df = _read(resolve_path(csv_path, fmt), columns)
+    return apply_schema(df, csv_path, float32_measures) if schema else df
+
+
+def _read(path, columns):
+    if path.endswith(".feather"):
+        from pyarrow import feather
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        table = pq.read_table(path, columns=columns, memory_map=True)
+        return table.to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def iter_table(csv_path, chunk_rows, fmt=None, columns=None, schema=True, float32_measures=False):
+    """
+    Yield the table read_table() would read as DataFrames of at most
+    `chunk_rows` rows, without loading it whole (Feather record batches are
+    sliced from the memory map; Parquet/CSV are read incrementally).
+    """
+    for chunk in _iter(resolve_path(csv_path, fmt), chunk_rows, columns):
+        yield apply_schema(chunk, csv_path, float32_measures) if schema else chunk
+
+
+def _iter(path, chunk_rows, columns):
+    if path.endswith(".feather"):
+        import pyarrow as pa
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(start, chunk_rows).to_pandas()
+        return
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunk_rows)
@@ -0,0 +1,135 @@
+import argparse
+import json
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import sys
+
+if not __package__:  # run as `python src/export_compact_models.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_preprocessing.storage import read_table
+from src.utils.compact_forest import from_sklearn, from_xgboost
+from src.utils.model_bundle import BundleFile, add_sections, bundle_path, compact_section
+
+# Paths
+DATA_FILE = "data/final/master_table.csv"
+MODELS_DIR = "models"
+REPORTS_DIR = "reports"
+REPORT_PATH = os.path.join(REPORTS_DIR, "compact_models.json")
+
+TARGET = "Yield"
+
+# Max allowed |compact - original| relative to the prediction scale
+DEFAULT_TOLERANCE = 1e-4
+
+CONVERTERS = {
+    "random_forest": from_sklearn,
+    "xgboost": from_xgboost,
+}
+
+
+def compact_prefix(crop_dir, safe_crop_name, kind):
+    return os.path.join(crop_dir, f"{safe_crop_name}_{kind}.compact")
+
+
+def validation_matrix(crop_df, encoder, feature_names):
+    """Encode a crop's rows exactly as train_per_crop.py did, in training feature order."""
+    X = crop_df.drop(columns=[TARGET, "Crop"])
+    cat_cols = X.select_dtypes(include=["object", "category"]).columns
+    num_cols = X.select_dtypes(exclude=["object", "category"]).columns
+    if len(cat_cols) > 0:
+        X = pd.DataFrame(
+            encoder.transform(X[cat_cols].astype(object)),
+            columns=encoder.get_feature_names_out(cat_cols),
+            index=X.index
+        ).join(X[num_cols])
+    return X.reindex(columns=feature_names, fill_value=0)
+
+
+def legacy_models(crop_dir, safe_crop_name):
+    """(encoder, feature names, {kind: (model, pickle bytes)}) from the pre-bundle pickle layout."""
+    encoder = joblib.load(os.path.join(crop_dir, f"{safe_crop_name}_encoder.pkl"))
+    feature_names = joblib.load(os.path.join(crop_dir, f"{safe_crop_name}_features.pkl"))
+    models = {}
+    for kind in CONVERTERS:
+        pkl_path = os.path.join(crop_dir, f"{safe_crop_name}_{kind}.pkl")
+        if os.path.exists(pkl_path):
+            models[kind] = (joblib.load(pkl_path), os.path.getsize(pkl_path))
+    return encoder, feature_names, models
+
+
+def export_crop(crop, crop_df, threshold_dtype="float64", tolerance=DEFAULT_TOLERANCE):
+    safe_crop_name = crop.replace("/", "_")
+    crop_dir = os.path.join(MODELS_DIR, safe_crop_name)
+    path = bundle_path(MODELS_DIR, crop)
+    if os.path.exists(path):
+        bundle = BundleFile(path)
+        encoder, feature_names = bundle.encoder(), bundle.feature_names
+        models = {kind: (bundle.load(kind), bundle.sections[kind]["length"])
+                  for kind in CONVERTERS if bundle.has(kind)}
+    else:
+        bundle = None
+        encoder, feature_names, models = legacy_models(crop_dir, safe_crop_name)
+    X = validation_matrix(crop_df, encoder, feature_names)
+
+    results, sections, section_meta = {}, {}, {}
+    for kind, (model, pickle_bytes) in models.items():
+        compact = CONVERTERS[kind](model, feature_names=feature_names, threshold_dtype=threshold_dtype)
+
+        # Random forests are fitted on a CSR matrix (no column names), XGBoost on a DataFrame
+        expected = model.predict(X if hasattr(model, "feature_names_in_") else X.to_numpy())
+        max_error = float(np.abs(compact.predict(X) - expected).max())
+        allowed = tolerance * max(1.0, float(np.abs(expected).max()))
+        ok = max_error <= allowed
+
+        if ok and bundle is not None:
+            sections[f"{kind}_compact"], section_meta[f"{kind}_compact"] = compact_section(compact)
+        elif ok:
+            compact.save(compact_prefix(crop_dir, safe_crop_name, kind))
+        results[kind] = {
+            "ok": ok,
+            "max_abs_error": max_error,
+            "pickle_bytes": pickle_bytes,
+            "compact_bytes": compact.nbytes,
+            "max_depth": compact.max_depth,
+        }
+        status = "✅" if ok else "❌ not exported,"
+        print(f"{status} {crop} [{kind}] max |Δ| = {max_error:.2e}, "
+              f"{results[kind]['pickle_bytes'] / 1e6:.1f} MB → {compact.nbytes / 1e6:.1f} MB")
+
+    if sections:
+        # One atomic rewrite of the bundle with the compact sections added
+        add_sections(path, sections, section_meta)
+    return results
+
+
+def export_compact_models(crops=None, threshold_dtype="float64", tolerance=DEFAULT_TOLERANCE):
+    df = read_table(DATA_FILE, float32_measures=True)
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    report = {}
+    for crop, crop_df in df.groupby("Crop", observed=True, sort=False):
+        crop = str(crop)
+        if crops and crop not in crops:
+            continue
+        if not os.path.isdir(os.path.join(MODELS_DIR, crop.replace("/", "_"))):
+            continue
+        report[crop] = export_crop(crop, crop_df, threshold_dtype, tolerance)
+
+    with open(REPORT_PATH, "w") as f:
+        json.dump({"threshold_dtype": threshold_dtype, "tolerance": tolerance, "crops": report}, f, indent=4)
+    print(f"\n🎉 Exported compact models for {len(report)} crop(s) — report in {REPORT_PATH}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert per-crop RF/XGBoost models into compact array models.")
+    parser.add_argument("--crops", nargs="+", help="only export these crops (default: all trained crops)")
+    parser.add_argument("--float32", action="store_true", help="store split thresholds as float32")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    export_compact_models(crops=args.crops, threshold_dtype="float32" if args.float32 else "float64",
+                          tolerance=args.tolerance)
@@ -7,6 +7,13 @@ from sklearn.ensemble import RandomForestRegressor
 from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
 from xgboost import XGBRegressor
 import numpy as np
+import sys
+
+if not __package__:  # run as `python src/train_models.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_preprocessing.storage import read_table
+from src.train_per_crop import dense_frame, sparse_matrix
 
 # Paths
 DATA_PATH = "data/final/master_table.csv"
@@ -17,13 +24,14 @@ os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
 # Load data
-df = pd.read_csv(DATA_PATH)
+df = read_table(DATA_PATH, float32_measures=True)
 
-# Encode categorical variables (e.g., State, Crop, Season)
-df = pd.get_dummies(df, drop_first=True)
+# Encode categorical variables (e.g., State, Crop, Season) as sparse float32 columns
+# (numeric columns stay dense)
+df = pd.get_dummies(df, drop_first=True, sparse=True, dtype=np.float32)
 
-# Features & target
-X = df.drop(columns=["Yield"])
+# Features & target (CSR float32 matrix: the dummies are mostly zeros)
+X, feature_names = sparse_matrix(df.drop(columns=["Yield"]))
 y = df["Yield"]
 
 # Train-test split
@@ -48,8 +56,9 @@ joblib.dump(rf, os.path.join(MODELS_DIR, "random_forest.pkl"))
 
 # --- Train XGBoost ---
 xgb = XGBRegressor(random_state=42, n_estimators=100)
-xgb.fit(X_train, y_train)
-xgb_metrics = evaluate_model(xgb, X_test, y_test)
+# Dense input: XGBoost reads the zeros a sparse matrix leaves out as missing values
+xgb.fit(dense_frame(X_train, feature_names), y_train)
+xgb_metrics = evaluate_model(xgb, dense_frame(X_test, feature_names), y_test)
 joblib.dump(xgb, os.path.join(MODELS_DIR, "xgboost.pkl"))
 
 # --- Compare Models ---
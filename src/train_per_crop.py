@@ -1,78 +1,270 @@
+import argparse
+import hashlib
+import json
 import os
-import joblib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+import sklearn
+import xgboost
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
 from sklearn.preprocessing import OneHotEncoder
+import sys
+
+if not __package__:  # run as `python src/train_per_crop.py`: make the `src` package importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_preprocessing.storage import read_table
+from src.utils.model_bundle import bundle_path, write_bundle
 
 # Paths
 DATA_FILE = "data/final/master_table.csv"
 MODELS_DIR = "models"
+REPORTS_DIR = "reports"
+TIMING_REPORT = os.path.join(REPORTS_DIR, "per_crop_training_times.json")
 
 TARGET = "Yield"
+MANIFEST_NAME = "manifest.json"  # per-crop, inside models/<crop>/
 
-def train_per_crop_models():
-    # Load dataset
-    df = pd.read_csv(DATA_FILE)
+# Hyperparameters (part of each crop's fingerprint: changing them triggers a retrain)
+SPLIT_PARAMS = {"test_size": 0.2, "random_state": 42}
+RF_PARAMS = {"n_estimators": 100, "random_state": 42}
+XGB_PARAMS = {"n_estimators": 100, "learning_rate": 0.1, "random_state": 42}
 
-    # Ensure models directory exists
-    os.makedirs(MODELS_DIR, exist_ok=True)
 
-    crops = df["Crop"].unique()
+def crop_dir_for(crop):
+    return os.path.join(MODELS_DIR, crop.replace("/", "_"))
+
+
+def crop_fingerprint(crop_df):
+    """
+    Hash of a crop's rows (in order, since the split depends on it), its feature
+    schema, and the training hyperparameters.
+    """
+    schema = [
+        (col, "string" if pd.api.types.is_string_dtype(crop_df[col]) or isinstance(crop_df[col].dtype, pd.CategoricalDtype)
+         else str(crop_df[col].dtype))
+        for col in crop_df.columns
+    ]
+    # Categoricals hash like plain strings, so CSV and Feather reads agree
+    rows = crop_df.astype({col: object for col, kind in schema if kind == "string"})
+
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(rows, index=False).to_numpy().tobytes())
+    digest.update(json.dumps({
+        "schema": schema,
+        "split": SPLIT_PARAMS,
+        "random_forest": RF_PARAMS,
+        "xgboost": XGB_PARAMS,
+    }, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def read_manifest(crop):
+    path = os.path.join(crop_dir_for(crop), MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(crop, manifest):
+    path = os.path.join(crop_dir_for(crop), MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp, path)
+
+
+def needs_training(crop, fingerprint):
+    manifest = read_manifest(crop)
+    if manifest is None or manifest.get("fingerprint") != fingerprint:
+        return True
+    return not os.path.exists(bundle_path(MODELS_DIR, crop))
+
+
+def sparse_matrix(frame):
+    """
+    (CSR float32 matrix, column names) for a frame of sparse one-hot columns
+    (e.g. get_dummies(sparse=True)) and dense numeric ones, sparse block first.
+    """
+    sparse_cols = [col for col, dtype in frame.dtypes.items() if isinstance(dtype, pd.SparseDtype)]
+    dense_cols = [col for col in frame.columns if col not in set(sparse_cols)]
+    blocks = [frame[sparse_cols].sparse.to_coo()] if sparse_cols else []
+    blocks.append(sp.csr_matrix(frame[dense_cols].to_numpy(dtype=np.float32)))
+    return sp.hstack(blocks, format="csr", dtype=np.float32), sparse_cols + dense_cols
+
 
-    for crop in crops:
-        print(f"\n🔄 Training models for crop: {crop}")
+def dense_frame(X, feature_names):
+    """Dense DataFrame of a CSR design matrix, for models that need named dense input."""
+    return pd.DataFrame(X.toarray(), columns=feature_names)
 
-        crop_df = df[df["Crop"] == crop].copy()
 
-        # Features / target
-        X = crop_df.drop(columns=[TARGET, "Crop"])
-        y = crop_df[TARGET]
+def train_crop(crop, crop_df, n_jobs=1, fingerprint=None):
+    """Train RF + XGBoost for one crop, save artifacts, and return a timing record."""
+    start = time.perf_counter()
+    print(f"\n🔄 Training models for crop: {crop}")
 
-        # Handle categorical features
-        cat_cols = X.select_dtypes(include=["object"]).columns
-        num_cols = X.select_dtypes(exclude=["object"]).columns
+    # Features / target
+    X = crop_df.drop(columns=[TARGET, "Crop"])
+    y = crop_df[TARGET]
 
-        encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=False)
-        X_cat = encoder.fit_transform(X[cat_cols]) if len(cat_cols) > 0 else None
+    # Handle categorical features
+    cat_cols = X.select_dtypes(include=["object", "category"]).columns
+    num_cols = X.select_dtypes(exclude=["object", "category"]).columns
 
-        if X_cat is not None:
-            X = pd.DataFrame(
-                X_cat,
-                columns=encoder.get_feature_names_out(cat_cols),
-                index=X.index
-            ).join(X[num_cols])
+    encoder = OneHotEncoder(handle_unknown="ignore", sparse_output=True, dtype=np.float32)
+    X_cat = encoder.fit_transform(X[cat_cols]) if len(cat_cols) > 0 else None
 
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
-        )
+    # CSR float32 design matrix: one column per category, then the numeric features
+    feature_names = list(num_cols)
+    X_num = sp.csr_matrix(X[num_cols].to_numpy(dtype=np.float32))
+    if X_cat is not None:
+        feature_names = [*encoder.get_feature_names_out(cat_cols), *feature_names]
+        X = sp.hstack([X_cat, X_num], format="csr")
+    else:
+        X = X_num
 
-        # Train Random Forest
-        rf = RandomForestRegressor(n_estimators=100, random_state=42)
-        rf.fit(X_train, y_train)
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X, y, **SPLIT_PARAMS)
 
-        # Train XGBoost
-        xgb = XGBRegressor(n_estimators=100, learning_rate=0.1, random_state=42)
-        xgb.fit(X_train, y_train)
+    # Train Random Forest
+    rf_start = time.perf_counter()
+    rf = RandomForestRegressor(**RF_PARAMS, n_jobs=n_jobs)
+    rf.fit(X_train, y_train)
+    rf_seconds = time.perf_counter() - rf_start
 
-        # ✅ Define safe names & crop dir
-        safe_crop_name = crop.replace("/", "_")
-        crop_dir = os.path.join(MODELS_DIR, safe_crop_name)
-        os.makedirs(crop_dir, exist_ok=True)
+    # Train XGBoost (dense: it would treat the zeros a sparse matrix leaves out as missing values)
+    xgb_start = time.perf_counter()
+    xgb = XGBRegressor(**XGB_PARAMS, n_jobs=n_jobs)
+    xgb.fit(dense_frame(X_train, feature_names), y_train)
+    xgb_seconds = time.perf_counter() - xgb_start
 
-        # ✅ Save feature names for later use during inference
-        feature_names_path = os.path.join(crop_dir, f"{safe_crop_name}_features.pkl")
-        joblib.dump(X_train.columns.tolist(), feature_names_path)
+    # ✅ Define crop dir
+    crop_dir = crop_dir_for(crop)
+    os.makedirs(crop_dir, exist_ok=True)
 
-        # ✅ Save models + encoder
-        joblib.dump(rf, os.path.join(crop_dir, f"{safe_crop_name}_random_forest.pkl"))
-        joblib.dump(xgb, os.path.join(crop_dir, f"{safe_crop_name}_xgboost.pkl"))
-        joblib.dump(encoder, os.path.join(crop_dir, f"{safe_crop_name}_encoder.pkl"))
+    # ✅ Save models + encoder categories + feature order as one bundle (atomic)
+    fingerprint = fingerprint or crop_fingerprint(crop_df)
+    trained_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    write_bundle(
+        bundle_path(MODELS_DIR, crop),
+        sections={"random_forest": rf, "xgboost": xgb},
+        feature_names=feature_names,
+        categorical_columns=list(cat_cols),
+        categories=[c.tolist() for c in encoder.categories_] if X_cat is not None else [],
+        metadata={
+            "crop": crop,
+            "rows": len(crop_df),
+            "fingerprint": fingerprint,
+            "trained_at": trained_at,
+            "hyperparameters": {"split": SPLIT_PARAMS, "random_forest": RF_PARAMS, "xgboost": XGB_PARAMS},
+            "versions": {"sklearn": sklearn.__version__, "xgboost": xgboost.__version__},
+        },
+    )
 
-        print(f"✅ Models & features saved for {crop} in {crop_dir}")
+    # Written last: a crash mid-save leaves the old fingerprint, forcing a retrain next run
+    write_manifest(crop, {
+        "crop": crop,
+        "fingerprint": fingerprint,
+        "rows": len(crop_df),
+        "trained_at": trained_at,
+    })
+
+    print(f"✅ Models & features saved for {crop} in {crop_dir}")
+    return {
+        "crop": crop,
+        "rows": len(crop_df),
+        "n_jobs": n_jobs,
+        "rf_seconds": round(rf_seconds, 3),
+        "xgb_seconds": round(xgb_seconds, 3),
+        "total_seconds": round(time.perf_counter() - start, 3),
+        "pid": os.getpid(),
+    }
+
+
+def plan_workers(n_crops, workers=None, threads_per_crop=None):
+    """
+    Split the CPU budget between crop-level processes and per-model threads so
+    workers × threads never exceeds the core count (no oversubscription).
+    """
+    cpus = os.cpu_count() or 1
+    if workers is None:
+        workers = cpus if threads_per_crop is None else max(1, cpus // threads_per_crop)
+    workers = max(1, min(workers, n_crops))
+    if threads_per_crop is None:
+        threads_per_crop = max(1, cpus // workers)
+    return workers, threads_per_crop
+
+
+def train_per_crop_models(crops=None, workers=None, threads_per_crop=None, force=False):
+    # Load dataset
+    df = read_table(DATA_FILE, float32_measures=True)
+
+    # Ensure models directory exists
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    available = [str(c) for c in df["Crop"].dropna().unique()]
+    if crops:
+        unknown = sorted(set(crops) - set(available))
+        if unknown:
+            raise ValueError(f"Unknown crop(s): {unknown}")
+        available = [c for c in available if c in set(crops)]
+
+    # Largest crops first so the long jobs don't end up last in the queue
+    groups = {crop: sub for crop, sub in df.groupby("Crop", observed=True, sort=False) if crop in available}
+    order = sorted(groups, key=lambda c: len(groups[c]), reverse=True)
+
+    # Skip crops whose data, schema and hyperparameters are unchanged
+    fingerprints = {crop: crop_fingerprint(groups[crop]) for crop in order}
+    skipped = [] if force else [c for c in order if not needs_training(c, fingerprints[c])]
+    order = [c for c in order if c not in set(skipped)]
+    if skipped:
+        print(f"⏭️ {len(skipped)} crop(s) unchanged, skipping (use --force to retrain)")
+    if not order:
+        print("🎉 All crop models are up to date")
+        return {"crops": [], "skipped": skipped}
+
+    workers, threads_per_crop = plan_workers(len(order), workers, threads_per_crop)
+    print(f"🚀 Training {len(order)} crop(s) with {workers} worker(s) × {threads_per_crop} thread(s)")
+
+    start = time.perf_counter()
+    timings = []
+    if workers == 1:
+        for crop in order:
+            timings.append(train_crop(crop, groups[crop], threads_per_crop, fingerprints[crop]))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(train_crop, crop, groups[crop], threads_per_crop, fingerprints[crop]) for crop in order]
+            for future in as_completed(futures):
+                timings.append(future.result())
+
+    report = {
+        "workers": workers,
+        "threads_per_crop": threads_per_crop,
+        "wall_seconds": round(time.perf_counter() - start, 3),
+        "crops": sorted(timings, key=lambda t: t["total_seconds"], reverse=True),
+        "skipped": skipped,
+    }
+    with open(TIMING_REPORT, "w") as f:
+        json.dump(report, f, indent=4)
+
+    print(f"\n🎉 Trained {len(order)} crop(s) in {report['wall_seconds']:.1f}s — timings in {TIMING_REPORT}")
+    return report
 
 
 if __name__ == "__main__":
-    train_per_crop_models()
+    parser = argparse.ArgumentParser(description="Train per-crop RandomForest and XGBoost models.")
+    parser.add_argument("--crops", nargs="+", help="only train these crops (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="crop-level worker processes")
+    parser.add_argument("--threads-per-crop", type=int, default=None, help="RF/XGB threads inside each worker")
+    parser.add_argument("--force", action="store_true", help="retrain even if a crop's fingerprint is unchanged")
+    args = parser.parse_args()
+
+    train_per_crop_models(crops=args.crops, workers=args.workers, threads_per_crop=args.threads_per_crop,
+                          force=args.force)
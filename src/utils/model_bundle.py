@@ -0,0 +1,203 @@
+"""
+Single-file, versioned per-crop model bundle (``models/<crop>/<crop>.bundle``).
+
+Layout::
+
+    b"CROPBNDL" | uint64 header length | JSON header | padding | sections...
+
+The JSON header carries the schema version, feature order, encoder
+categories and training metadata, plus the offset/length of every section.
+Sections are either pickles (e.g. the fitted RF / XGBoost models) or raw
+NumPy arrays (compact forests), aligned so arrays can be memory-mapped in
+place. Readers only parse the header up front; sections are loaded on first
+access. Bundles are written to a temp file and renamed, so a reader never
+sees a half-written retrain.
+"""
+import json
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from src.utils.compact_forest import CompactForest
+
+SCHEMA_VERSION = 1
+MAGIC = b"CROPBNDL"
+ALIGN = 64
+
+
+def bundle_path(models_dir, crop):
+    safe_crop_name = crop.replace("/", "_")
+    return os.path.join(models_dir, safe_crop_name, f"{safe_crop_name}.bundle")
+
+
+def _aligned(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _encode_section(value):
+    """(header entry, payload bytes) for a pickle-able object, ndarray, or raw pickle bytes."""
+    if isinstance(value, RawSection):
+        return dict(value.entry), value.payload
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        dtype = array.dtype.descr if array.dtype.names else array.dtype.str
+        return {"kind": "array", "dtype": dtype, "shape": list(array.shape)}, array.tobytes()
+    return {"kind": "pickle"}, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class RawSection:
+    """An already-encoded section copied verbatim (used when rewriting a bundle)."""
+
+    def __init__(self, entry, payload):
+        self.entry = {k: v for k, v in entry.items() if k not in ("offset", "length")}
+        self.payload = payload
+
+
+def write_bundle(path, sections, feature_names, categorical_columns=(), categories=(), metadata=None):
+    """
+    Atomically write a bundle. `sections` maps name → object to pickle or
+    ndarray; an ndarray section may carry extra JSON in `metadata["sections"][name]`.
+    """
+    metadata = dict(metadata or {})
+    section_meta = metadata.pop("sections", {})
+
+    entries, payloads, offset = {}, [], 0
+    for name, value in sections.items():
+        entry, payload = _encode_section(value)
+        if name in section_meta:
+            entry["meta"] = section_meta[name]
+        entry.update(offset=offset, length=len(payload))
+        entries[name] = entry
+        payloads.append(payload)
+        offset = _aligned(offset + len(payload))
+
+    header = json.dumps({
+        "schema_version": SCHEMA_VERSION,
+        "feature_names": list(feature_names),
+        "categorical_columns": list(categorical_columns),
+        "categories": [list(c) for c in categories],
+        "metadata": metadata,
+        "sections": entries,
+    }).encode()
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+        data_start = f.tell()
+        for entry, payload in zip(entries.values(), payloads):
+            f.write(b"\0" * (data_start + entry["offset"] - f.tell()))
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class BundleFile:
+    """Lazy reader: parses the header on open, loads sections on demand."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a model bundle: {path}")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            self.header = json.loads(f.read(header_len))
+            self.data_start = _aligned(f.tell())
+
+        version = self.header.get("schema_version")
+        if version != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported bundle schema version {version} in {path}")
+        self._cache = {}
+
+    @property
+    def feature_names(self):
+        return self.header["feature_names"]
+
+    @property
+    def categorical_columns(self):
+        return self.header["categorical_columns"]
+
+    @property
+    def categories(self):
+        return self.header["categories"]
+
+    @property
+    def metadata(self):
+        return self.header["metadata"]
+
+    @property
+    def sections(self):
+        return self.header["sections"]
+
+    def has(self, name):
+        return name in self.sections
+
+    def _read_payload(self, entry):
+        with open(self.path, "rb") as f:
+            f.seek(self.data_start + entry["offset"])
+            return f.read(entry["length"])
+
+    def load(self, name):
+        if name not in self._cache:
+            entry = self.sections[name]
+            if entry["kind"] == "array":
+                descr = entry["dtype"]
+                dtype = np.dtype([tuple(field) for field in descr] if isinstance(descr, list) else descr)
+                self._cache[name] = np.memmap(self.path, dtype=dtype, mode="r",
+                                              offset=self.data_start + entry["offset"], shape=tuple(entry["shape"]))
+            else:
+                self._cache[name] = pickle.loads(self._read_payload(entry))
+        return self._cache[name]
+
+    def raw_section(self, name):
+        return RawSection(self.sections[name], self._read_payload(self.sections[name]))
+
+    def compact(self, kind="random_forest"):
+        """CompactForest for `kind` if the bundle has one (see export_compact_models.py), else None."""
+        name = f"{kind}_compact"
+        if not self.has(name):
+            return None
+        meta = self.sections[name]["meta"]
+        return CompactForest(self.load(name), meta["roots"], meta["max_depth"], meta["n_features"],
+                             meta["feature_names"], meta["aggregate"], meta["base_score"], meta.get("source"))
+
+    def encoder(self):
+        """A fitted OneHotEncoder equivalent to the one used at training time."""
+        import pandas as pd
+        from sklearn.preprocessing import OneHotEncoder
+
+        encoder = OneHotEncoder(categories=[list(c) for c in self.categories],
+                                handle_unknown="ignore", sparse_output=False)
+        if self.categorical_columns:
+            # Categories are fixed explicitly; fit only needs one valid row
+            encoder.fit(pd.DataFrame({col: [cats[0]] for col, cats in zip(self.categorical_columns, self.categories)}))
+        return encoder
+
+
+def add_sections(path, new_sections, section_meta=None):
+    """Rewrite a bundle with extra/replaced sections; existing sections are copied verbatim."""
+    bundle = BundleFile(path)
+    sections = {name: bundle.raw_section(name) for name in bundle.sections if name not in new_sections}
+    sections.update(new_sections)
+
+    metadata = dict(bundle.metadata)
+    metadata["sections"] = {name: e["meta"] for name, e in bundle.sections.items() if "meta" in e}
+    metadata["sections"].update(section_meta or {})
+    write_bundle(path, sections, bundle.feature_names, bundle.categorical_columns, bundle.categories, metadata)
+
+
+def compact_section(compact):
+    """(nodes array, section meta) for storing a CompactForest in a bundle."""
+    meta = {
+        "aggregate": compact.aggregate,
+        "base_score": compact.base_score,
+        "max_depth": compact.max_depth,
+        "n_features": compact.n_features,
+        "feature_names": compact.feature_names,
+        "roots": compact.roots.tolist(),
+        "source": compact.source,
+    }
+    return np.asarray(compact.nodes), meta